@@ -1,6 +1,50 @@
-"""TG Notes Toolkit."""
+"""TG Notes Toolkit.
+
+Public names are resolved on first access so that importing the package stays cheap.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:  # pragma: no cover - static analysis only
+    from .db import DEFAULT_DB_PATH, Database, init_db
+    from .models import Exercise, Note
+
+_EXPORTS = {
+    "Database": "db",
+    "DEFAULT_DB_PATH": "db",
+    "init_db": "db",
+    "Exercise": "models",
+    "Note": "models",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        return _import_submodule(name)
+    # ``__import__`` (unlike importlib.import_module) is reported by ``python -X importtime``.
+    module = __import__(module_name, globals(), fromlist=[name], level=1)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def _import_submodule(name: str) -> Any:
+    # Submodules were attributes of the eagerly imported package; keep ``package.module`` working.
+    if not name.startswith("_"):
+        try:
+            __import__(f"{__name__}.{name}")
+        except ModuleNotFoundError as exc:
+            if exc.name != f"{__name__}.{name}":
+                raise
+        else:
+            return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *_EXPORTS})
 
-from .db import Database, DEFAULT_DB_PATH, init_db
-from .models import Exercise, Note
 
 __all__ = ["Database", "DEFAULT_DB_PATH", "init_db", "Exercise", "Note"]
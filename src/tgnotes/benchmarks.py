@@ -0,0 +1,430 @@
+"""Reproducible offline benchmarks for ingestion, processing and storage.
+
+Run ``python -m tgnotes.benchmarks --output results.json`` to measure every subsystem, and add
+``--baseline baseline.json`` to fail when throughput or memory regresses beyond ``--threshold``.
+Corpora are synthesised from a fixed seed and all importers use in-memory stub backends, so no
+network access or optional dependency is needed.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from . import db, transfer
+from .models import CompactExercise, Exercise, Note
+from .services.exercise_generator import ExerciseGenerator
+from .services.ocr_importer import OcrImporter
+from .services.pdf_importer import PdfImporter
+from .services.pipeline import TextProcessingPipeline
+from .services.web_importer import WebContentImporter
+
+DEFAULT_SEED = 1234
+DEFAULT_THRESHOLD = 0.2
+
+VOCABULARY = {
+    "en": "language learning notes exercise memory practice vocabulary reading writing sentence meaning".split(),
+    "ru": "язык обучение заметка упражнение память практика словарь чтение письмо предложение".split(),
+    "de": "Sprache Lernen Notiz Übung Gedächtnis Übung Wortschatz Lesen Schreiben Satz Bedeutung".split(),
+    "es": "idioma aprendizaje nota ejercicio memoria práctica vocabulario lectura escritura oración".split(),
+    "ja": "言語 学習 ノート 練習 記憶 語彙 読書 作文 文章 意味".split(),
+}
+
+
+def synthetic_text(rng: random.Random, words: int) -> str:
+    """Return a multilingual paragraph of roughly ``words`` words with punctuation and spacing noise."""
+    parts: List[str] = []
+    languages = list(VOCABULARY)
+    language = rng.choice(languages)
+    for position in range(words):
+        if rng.random() < 0.1:
+            language = rng.choice(languages)
+        parts.append(rng.choice(VOCABULARY[language]))
+        if position % 12 == 11:
+            parts[-1] += rng.choice([".", "!", "?", ",\n"])
+    return "  ".join(parts) if rng.random() < 0.2 else " ".join(parts)
+
+
+def synthetic_corpus(seed: int, documents: int, words: int) -> List[str]:
+    rng = random.Random(seed)
+    return [synthetic_text(rng, words) for _ in range(documents)]
+
+
+class _StubPdfBackend:
+    def __init__(self, pages: Sequence[str]):
+        self._pages = pages
+
+    def open(self, path: Path) -> "_StubPdfDocument":
+        return _StubPdfDocument(self._pages)
+
+
+class _StubPdfDocument:
+    def __init__(self, pages: Sequence[str]):
+        self.pages = [_StubPdfPage(text) for text in pages]
+
+    def __enter__(self) -> "_StubPdfDocument":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+class _StubPdfPage:
+    def __init__(self, text: str):
+        self._text = text
+
+    def extract_text(self) -> str:
+        return self._text
+
+
+class _StubOcrEngine:
+    def image_to_string(self, image) -> str:
+        return image.decode("utf-8")
+
+
+@dataclass(slots=True)
+class Context:
+    seed: int
+    scale: float
+    workdir: Path
+    teardown: List[Callable[[], Any]] = field(default_factory=list)
+
+    def count(self, base: int) -> int:
+        return max(1, int(base * self.scale))
+
+    def defer(self, callback: Callable[[], Any]) -> None:
+        """Run ``callback`` once the benchmark has been measured (e.g. to close a connection)."""
+        self.teardown.append(callback)
+
+    def close(self) -> None:
+        while self.teardown:
+            self.teardown.pop()()
+
+
+@dataclass(slots=True)
+class Benchmark:
+    """A named benchmark: ``setup(context)`` prepares data and returns the operation to time.
+
+    Resources the operation keeps open are registered with :meth:`Context.defer`.
+    """
+
+    name: str
+    setup: Callable[[Context], Callable[[], Any]]
+    iterations: int
+
+
+def _pipeline(context: Context) -> Callable[[], Any]:
+    corpus = iter(_cycle(synthetic_corpus(context.seed, 64, context.count(400))))
+    pipeline = TextProcessingPipeline()
+    return lambda: pipeline.process(next(corpus))
+
+
+def _generator(context: Context) -> Callable[[], Any]:
+    pipeline = TextProcessingPipeline()
+    units = iter(
+        _cycle([pipeline.process(text).lexical_units for text in synthetic_corpus(context.seed, 64, 200)])
+    )
+    generator = ExerciseGenerator()
+    note = Note(id=1, content="", source_type="raw")
+
+    def run() -> Exercise:
+        payload = generator.generate_recall_words(next(units))
+        return generator.as_model(note, payload, difficulty="medium")
+
+    return run
+
+
+def _pdf_import(context: Context) -> Callable[[], Any]:
+    pages = synthetic_corpus(context.seed, context.count(200), 150)
+    path = context.workdir / "stub.pdf"
+    path.write_bytes(b"")
+    importer = PdfImporter(backend=_StubPdfBackend(pages))
+    return lambda: importer.parse(path)
+
+
+def _ocr_import(context: Context) -> Callable[[], Any]:
+    path = context.workdir / "stub.png"
+    path.write_text(synthetic_text(random.Random(context.seed), context.count(300)), encoding="utf-8")
+    importer = OcrImporter(engine=_StubOcrEngine())
+    return lambda: importer.parse(path)
+
+
+def _web_import(context: Context) -> Callable[[], Any]:
+    paragraphs = synthetic_corpus(context.seed, context.count(100), 60)
+    html = "<html><body>" + "".join(f"<h2>Section</h2><p>{text}</p>" for text in paragraphs) + "</body></html>"
+    importer = WebContentImporter(fetcher=lambda url, token=None: html)
+    return lambda: importer.fetch("https://example.invalid/page")
+
+
+def _database(context: Context, name: str) -> db.Database:
+    database = db.Database(context.workdir / f"{name}.db")
+    db.init_db(database)
+    return database
+
+
+def _populate(database: db.Database, context: Context, notes: int, exercises_per_note: int) -> None:
+    corpus = synthetic_corpus(context.seed, 32, 300)
+    generator = ExerciseGenerator()
+    pipeline = TextProcessingPipeline()
+    payloads = [generator.generate_move_words(pipeline.process(text).lexical_units) for text in corpus]
+    with database.session() as connection:
+        for index in range(notes):
+            note = db.insert_note(connection, Note(content=corpus[index % len(corpus)], source_type="raw"))
+            for offset in range(exercises_per_note):
+                payload = payloads[(index + offset) % len(payloads)]
+                db.insert_exercise(connection, generator.as_compact_model(note, payload, difficulty="easy"))
+
+
+def _db_insert_note(context: Context) -> Callable[[], Any]:
+    database = _database(context, "insert_note")
+    corpus = iter(_cycle(synthetic_corpus(context.seed, 64, 300)))
+    connection = database.connect()
+    context.defer(connection.close)
+
+    def run() -> Note:
+        note = db.insert_note(connection, Note(content=next(corpus), source_type="raw", metadata={"bench": True}))
+        connection.commit()
+        return note
+
+    return run
+
+
+def _db_insert_exercise(context: Context) -> Callable[[], Any]:
+    database = _database(context, "insert_exercise")
+    _populate(database, context, notes=1, exercises_per_note=0)
+    generator = ExerciseGenerator()
+    pipeline = TextProcessingPipeline()
+    payloads = iter(
+        _cycle(
+            [
+                generator.generate_recall_words(pipeline.process(text).lexical_units)
+                for text in synthetic_corpus(context.seed, 32, 200)
+            ]
+        )
+    )
+    note = Note(id=1, content="", source_type="raw")
+    connection = database.connect()
+    context.defer(connection.close)
+
+    def run() -> CompactExercise:
+        # The path ExerciseService takes: the compact form is encoded without rendering the text.
+        exercise = db.insert_exercise(connection, generator.as_compact_model(note, next(payloads), difficulty="easy"))
+        connection.commit()
+        return exercise
+
+    return run
+
+
+def _db_list_notes(context: Context) -> Callable[[], Any]:
+    database = _database(context, "list_notes")
+    _populate(database, context, notes=context.count(2000), exercises_per_note=0)
+
+    def run() -> List[Note]:
+        with database.session() as connection:
+            return db.list_notes(connection)
+
+    return run
+
+
+def _db_list_exercises(context: Context) -> Callable[[], Any]:
+    database = _database(context, "list_exercises")
+    notes = context.count(100)
+    _populate(database, context, notes=notes, exercises_per_note=20)
+    note_ids = iter(_cycle(list(range(1, notes + 1))))
+
+    def run() -> List[Exercise]:
+        with database.session() as connection:
+            return db.list_exercises(connection, next(note_ids))
+
+    return run
+
+
+def _transfer_export(context: Context) -> Callable[[], Any]:
+    database = _database(context, "export")
+    _populate(database, context, notes=context.count(1000), exercises_per_note=2)
+    return lambda: transfer.export_records(database, io.StringIO())
+
+
+def _transfer_import(context: Context) -> Callable[[], Any]:
+    source = _database(context, "import_source")
+    _populate(source, context, notes=context.count(1000), exercises_per_note=2)
+    dump = io.StringIO()
+    transfer.export_records(source, dump)
+    target = _database(context, "import_target")
+
+    def run() -> transfer.ImportResult:
+        return transfer.import_records(target, io.StringIO(dump.getvalue()))
+
+    return run
+
+
+def _cycle(values: Sequence[Any]) -> Iterator[Any]:
+    while True:
+        yield from values
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    benchmark.name: benchmark
+    for benchmark in (
+        Benchmark("pipeline.process", _pipeline, iterations=500),
+        Benchmark("exercise_generator.recall_words", _generator, iterations=2000),
+        Benchmark("pdf_import.parse", _pdf_import, iterations=50),
+        Benchmark("ocr_import.parse", _ocr_import, iterations=500),
+        Benchmark("web_import.fetch", _web_import, iterations=100),
+        Benchmark("db.insert_note", _db_insert_note, iterations=500),
+        Benchmark("db.insert_exercise", _db_insert_exercise, iterations=500),
+        Benchmark("db.list_notes", _db_list_notes, iterations=20),
+        Benchmark("db.list_exercises", _db_list_exercises, iterations=200),
+        Benchmark("transfer.export", _transfer_export, iterations=10),
+        Benchmark("transfer.import", _transfer_import, iterations=10),
+    )
+}
+
+
+def _percentile(samples: Sequence[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(benchmark: Benchmark, context: Context, iterations: Optional[int] = None) -> Dict[str, Any]:
+    """Time ``benchmark`` and report ops/sec, p50/p99 latency and peak traced memory.
+
+    Latency is measured without tracemalloc; peak memory comes from a separate, shorter traced pass.
+    """
+    iterations = iterations or max(1, int(benchmark.iterations * context.scale))
+    try:
+        operation = benchmark.setup(context)
+        operation()  # warm-up: caches, lazily compiled regexes, SQLite page cache
+
+        latencies: List[float] = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            start = time.perf_counter()
+            operation()
+            latencies.append(time.perf_counter() - start)
+        total = time.perf_counter() - started
+
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        for _ in range(max(1, min(iterations, 10))):
+            operation()
+        _, peak = tracemalloc.get_traced_memory()
+        if not already_tracing:
+            tracemalloc.stop()
+    finally:
+        context.close()
+
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / total if total else float("inf"),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "peak_memory_kib": max(0, peak - baseline) / 1024,
+    }
+
+
+def run_benchmarks(
+    names: Optional[Sequence[str]] = None, seed: int = DEFAULT_SEED, scale: float = 1.0
+) -> Dict[str, Any]:
+    selected = list(names) if names else list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(unknown)}")
+
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="tgnotes-bench-") as workdir:
+        for name in selected:
+            benchmark_dir = Path(workdir) / name
+            benchmark_dir.mkdir()
+            results[name] = measure(BENCHMARKS[name], Context(seed=seed, scale=scale, workdir=benchmark_dir))
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "scale": scale,
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Return a description of every metric that regressed by more than ``threshold`` (a fraction)."""
+    regressions = []
+    for name, result in current["benchmarks"].items():
+        reference = baseline.get("benchmarks", {}).get(name)
+        if reference is None:
+            continue
+        if result["ops_per_sec"] < reference["ops_per_sec"] * (1 - threshold):
+            regressions.append(
+                f"{name}: ops/sec {result['ops_per_sec']:.1f} < baseline {reference['ops_per_sec']:.1f}"
+            )
+        if result["p50_ms"] > reference["p50_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p50 {result['p50_ms']:.3f} ms > baseline {reference['p50_ms']:.3f} ms")
+        # Allocations under a few KiB are dominated by interpreter noise.
+        limit = max(reference["peak_memory_kib"] * (1 + threshold), reference["peak_memory_kib"] + 64)
+        if result["peak_memory_kib"] > limit:
+            regressions.append(
+                f"{name}: peak memory {result['peak_memory_kib']:.1f} KiB > "
+                f"baseline {reference['peak_memory_kib']:.1f} KiB"
+            )
+    return regressions
+
+
+def format_results(results: Dict[str, Any]) -> str:
+    lines = [f"{'benchmark':<34}{'ops/sec':>12}{'p50 ms':>10}{'p99 ms':>10}{'peak KiB':>11}"]
+    for name, result in results["benchmarks"].items():
+        lines.append(
+            f"{name:<34}{result['ops_per_sec']:>12.1f}{result['p50_ms']:>10.3f}"
+            f"{result['p99_ms']:>10.3f}{result['peak_memory_kib']:>11.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m tgnotes.benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="Run only this benchmark.")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for corpus sizes and iterations.")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this path.")
+    parser.add_argument("--baseline", type=Path, help="Compare against results stored at this path.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed regression fraction.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.only, seed=args.seed, scale=args.scale)
+    print(format_results(results))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.baseline and args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        return 0
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
+
+
+__all__ = ["BENCHMARKS", "Benchmark", "compare", "measure", "run_benchmarks", "synthetic_corpus", "main"]
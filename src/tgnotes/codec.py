@@ -0,0 +1,184 @@
+"""Compact storage encodings for exercise payloads and note content.
+
+Exercise payloads are stored as a small binary record instead of the text protocol: the word list
+once, NUL-separated, and the body as a sentence template id applied to every word (free-form
+bodies are kept verbatim, zlib-compressed when large). :meth:`CompactPayload.serialize` rebuilds
+the text protocol byte for byte on demand.
+"""
+from __future__ import annotations
+
+import struct
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+TEMPLATES: Dict[int, str] = {
+    1: "- Move the word '{word}' into a meaningful sentence.",
+    2: "- Recall a definition or usage example for '{word}'.",
+}
+TEMPLATE_FOR_TYPE: Dict[str, int] = {"move_words": 1, "recall_words": 2}
+# Each template split around its single ``{word}`` slot, so a body renders with one ``str.join``.
+_TEMPLATE_PARTS: Dict[int, Tuple[str, str]] = {
+    template_id: tuple(template.split("{word}")) for template_id, template in TEMPLATES.items()  # type: ignore[misc]
+}
+
+FORMAT_VERSION = 1
+FREE_FORM_BODY = 0x01
+COMPRESSED_BODY = 0x02
+WORDS_IN_METADATA = 0x04
+BODY_COMPRESSION_THRESHOLD = 512
+
+_HEADER = struct.Struct("<BBHHI")
+
+
+@dataclass(slots=True)
+class CompactPayload:
+    """Structured form of an exercise payload; ``template_id`` is ``None`` for free-form bodies."""
+
+    type: str
+    words: Tuple[str, ...]
+    template_id: Optional[int] = None
+    body: Optional[str] = None
+
+    def render_body(self) -> str:
+        if self.template_id is None:
+            return self.body or ""
+        if not self.words:
+            return ""
+        prefix, suffix = _TEMPLATE_PARTS[self.template_id]
+        return prefix + f"{suffix}\n{prefix}".join(self.words) + suffix
+
+    def serialize(self) -> str:
+        header = f"type: {self.type}\nwords: {', '.join(self.words)}\nexercise_start"
+        return f"{header}\n{self.render_body().strip()}\nexercise_end"
+
+    @classmethod
+    def from_parts(cls, exercise_type: str, words: Sequence[str], body: str) -> "CompactPayload":
+        """Build the most compact form whose rendered body equals ``body``."""
+        words = tuple(words)
+        for template_id in _candidate_templates(exercise_type):
+            if not words:
+                if not body:
+                    return cls(exercise_type, words, template_id)
+                break
+            prefix, suffix = _TEMPLATE_PARTS[template_id]
+            if body.startswith(prefix) and prefix + f"{suffix}\n{prefix}".join(words) + suffix == body:
+                return cls(exercise_type, words, template_id)
+        return cls(exercise_type, words, None, body)
+
+    @classmethod
+    def parse(
+        cls, exercise_type: str, text: str, words: Optional[Sequence[str]] = None
+    ) -> Optional["CompactPayload"]:
+        """Parse the text protocol; return ``None`` unless the result serializes back to ``text`` exactly.
+
+        ``words`` (usually ``metadata["words"]``) is preferred over splitting the header line, which
+        is ambiguous when a word contains ``", "``.
+        """
+        prefix = f"type: {exercise_type}\nwords: "
+        suffix = "\nexercise_end"
+        if not text.startswith(prefix) or not text.endswith(suffix):
+            return None
+        words_line, marker, body = text[len(prefix) : -len(suffix)].partition("\nexercise_start\n")
+        # serialize() strips the body, so a body with surrounding whitespace cannot round-trip.
+        if not marker or body != body.strip():
+            return None
+        if words is not None and ", ".join(words) == words_line:
+            parsed_words: Sequence[str] = words
+        else:
+            parsed_words = words_line.split(", ") if words_line else ()
+        # The words join back to ``words_line`` and from_parts() renders ``body`` exactly, so the
+        # result serializes to ``text`` without a second rendering pass.
+        return cls.from_parts(exercise_type, parsed_words, body)
+
+
+@lru_cache(maxsize=None)
+def _candidate_templates(exercise_type: str) -> Tuple[int, ...]:
+    preferred = TEMPLATE_FOR_TYPE.get(exercise_type)
+    others = tuple(template_id for template_id in TEMPLATES if template_id != preferred)
+    return (preferred, *others) if preferred is not None else others
+
+
+def encode_payload(payload: CompactPayload, words_in_metadata: bool = False) -> bytes:
+    if len(payload.words) > 0xFFFF or any("\x00" in word for word in payload.words):
+        raise ValueError("Words cannot be represented in the compact payload format")
+    words = "\x00".join(payload.words).encode("utf-8")
+    flags = WORDS_IN_METADATA if words_in_metadata else 0
+    body = b""
+    if payload.template_id is None:
+        flags |= FREE_FORM_BODY
+        body = (payload.body or "").encode("utf-8")
+        if len(body) >= BODY_COMPRESSION_THRESHOLD:
+            compressed = zlib.compress(body)
+            if len(compressed) < len(body):
+                flags |= COMPRESSED_BODY
+                body = compressed
+    header = _HEADER.pack(FORMAT_VERSION, flags, payload.template_id or 0, len(payload.words), len(words))
+    return header + words + body
+
+
+def decode_payload(exercise_type: str, blob: bytes) -> Tuple[CompactPayload, bool]:
+    """Return the payload and whether its words should be mirrored into ``metadata["words"]``."""
+    version, flags, template_id, count, size = _HEADER.unpack_from(blob)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compact payload version {version}")
+    offset = _HEADER.size + size
+    words = tuple(blob[_HEADER.size : offset].decode("utf-8").split("\x00")) if count else ()
+    if flags & FREE_FORM_BODY:
+        body = blob[offset:]
+        if flags & COMPRESSED_BODY:
+            body = zlib.decompress(body)
+        payload = CompactPayload(exercise_type, words, None, body.decode("utf-8"))
+    else:
+        payload = CompactPayload(exercise_type, words, template_id)
+    return payload, bool(flags & WORDS_IN_METADATA)
+
+
+def decode_text(exercise_type: str, blob: bytes) -> Tuple[str, Optional[List[str]]]:
+    """Render the text protocol straight from ``blob``; the read-path shortcut for :func:`decode_payload`.
+
+    Returns the text and, when the words are mirrored into metadata, the word list.
+    """
+    version, flags, template_id, count, size = _HEADER.unpack_from(blob)
+    if version != FORMAT_VERSION or flags & FREE_FORM_BODY:
+        payload, words_in_metadata = decode_payload(exercise_type, blob)
+        return payload.serialize(), list(payload.words) if words_in_metadata else None
+    end = _HEADER.size + size
+    words = blob[_HEADER.size : end].decode("utf-8").split("\x00") if count else []
+    if words:
+        prefix, suffix = _TEMPLATE_PARTS[template_id]
+        body = prefix + f"{suffix}\n{prefix}".join(words) + suffix
+    else:
+        body = ""
+    text = f"type: {exercise_type}\nwords: {', '.join(words)}\nexercise_start\n{body.strip()}\nexercise_end"
+    return text, words if flags & WORDS_IN_METADATA else None
+
+
+def encode_content(text: str, threshold: Optional[int]) -> str | bytes:
+    """Return zlib-compressed UTF-8 when ``text`` is at least ``threshold`` bytes and compression helps."""
+    if threshold is None:
+        return text
+    data = text.encode("utf-8")
+    if len(data) < threshold:
+        return text
+    compressed = zlib.compress(data)
+    return compressed if len(compressed) < len(data) else text
+
+
+def decode_content(value: str | bytes) -> str:
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode("utf-8")
+    return value
+
+
+__all__ = [
+    "CompactPayload",
+    "TEMPLATES",
+    "TEMPLATE_FOR_TYPE",
+    "decode_content",
+    "decode_payload",
+    "decode_text",
+    "encode_content",
+    "encode_payload",
+]
@@ -4,19 +4,25 @@ from __future__ import annotations
 import json
 import sqlite3
 from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import Generator
+from typing import Any, Dict, Generator, Optional, Tuple
 
-from .models import Exercise, Note
+from . import codec, metrics
+from .models import CompactExercise, Exercise, Note
 
 DEFAULT_DB_PATH = Path("app.db")
 
 
 class Database:
-    """Simple wrapper around SQLite connections."""
+    """Simple wrapper around SQLite connections.
 
-    def __init__(self, path: str | Path = DEFAULT_DB_PATH):
+    ``compress_threshold`` enables zlib compression of note contents of at least that many bytes.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_DB_PATH, compress_threshold: Optional[int] = None):
         self.path = Path(path)
+        self.compress_threshold = compress_threshold
         self.path.parent.mkdir(parents=True, exist_ok=True)
 
     def connect(self) -> sqlite3.Connection:
@@ -26,15 +32,17 @@ class Database:
 
     @contextmanager
     def session(self) -> Generator[sqlite3.Connection, None, None]:
-        connection = self.connect()
-        try:
-            yield connection
-            connection.commit()
-        except Exception:
-            connection.rollback()
-            raise
-        finally:
-            connection.close()
+        with metrics.timer("db.session"):
+            connection = self.connect()
+            try:
+                yield connection
+                with metrics.timer("db.commit"):
+                    connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                connection.close()
 
 
 def init_db(database: Database) -> None:
@@ -69,7 +77,7 @@ def init_db(database: Database) -> None:
 def _row_to_note(row: sqlite3.Row) -> Note:
     return Note(
         id=row["id"],
-        content=row["content"],
+        content=codec.decode_content(row["content"]),
         source_type=row["source_type"],
         metadata=json.loads(row["metadata"]),
         created_at=_parse_datetime(row["created_at"]),
@@ -77,33 +85,90 @@ def _row_to_note(row: sqlite3.Row) -> Note:
 
 
 def _row_to_exercise(row: sqlite3.Row) -> Exercise:
+    payload = row["payload"]
+    metadata = json.loads(row["metadata"])
+    if isinstance(payload, bytes):
+        payload, words = codec.decode_text(row["type"], payload)
+        if words is not None:
+            metadata["words"] = words
     return Exercise(
         id=row["id"],
         note_id=row["note_id"],
         type=row["type"],
         difficulty=row["difficulty"],
-        payload=row["payload"],
-        metadata=json.loads(row["metadata"]),
+        payload=payload,
+        metadata=metadata,
         created_at=_parse_datetime(row["created_at"]),
     )
 
 
-def _parse_datetime(value: str):
-    from datetime import datetime
-
+def _parse_datetime(value: str) -> datetime:
     return datetime.fromisoformat(value)
 
 
-def insert_note(connection: sqlite3.Connection, note: Note) -> Note:
+def encode_exercise(exercise_type: str, payload: str, metadata: Dict[str, Any]) -> Tuple[str | bytes, str]:
+    """Return the stored ``payload`` and ``metadata`` columns, using the compact format when it round-trips.
+
+    Shared by :func:`insert_exercise`, :func:`migrate_compact_storage` and bulk import, which
+    builds its own ``executemany`` rows.
+    """
+    words = metadata.get("words")
+    if not isinstance(words, list):
+        words = None
+    try:
+        compact = codec.CompactPayload.parse(exercise_type, payload, words)
+    except TypeError:
+        # ``", ".join`` rejects non-string entries, which therefore cannot be the protocol's word
+        # list; catching that instead of type-checking every word keeps bulk import cheap.
+        words = None
+        compact = codec.CompactPayload.parse(exercise_type, payload)
+    encoded = None if compact is None else _encode_compact(compact, metadata, words)
+    return encoded if encoded is not None else (payload, json.dumps(metadata))
+
+
+def _encode_compact(
+    compact: codec.CompactPayload, metadata: Dict[str, Any], words: Any
+) -> Optional[Tuple[bytes, str]]:
+    """Encode ``compact``, dropping ``metadata["words"]`` when it equals the payload's words."""
+    mirrored = isinstance(words, list) and tuple(words) == compact.words
+    try:
+        encoded = codec.encode_payload(compact, words_in_metadata=mirrored)
+    except ValueError:
+        return None
+    if mirrored:
+        metadata = {key: value for key, value in metadata.items() if key != "words"}
+    return encoded, json.dumps(metadata)
+
+
+def insert_note(connection: sqlite3.Connection, note: Note, compress_threshold: Optional[int] = None) -> Note:
     cursor = connection.execute(
         "INSERT INTO notes (content, source_type, metadata, created_at) VALUES (?, ?, ?, ?)",
-        (note.content, note.source_type, json.dumps(note.metadata), note.created_at.isoformat()),
+        (
+            codec.encode_content(note.content, compress_threshold),
+            note.source_type,
+            json.dumps(note.metadata),
+            note.created_at.isoformat(),
+        ),
     )
     note.id = cursor.lastrowid
     return note
 
 
-def insert_exercise(connection: sqlite3.Connection, exercise: Exercise) -> Exercise:
+def insert_exercise(
+    connection: sqlite3.Connection, exercise: Exercise | CompactExercise, compact: bool = True
+) -> Exercise | CompactExercise:
+    """Insert ``exercise``; a :class:`CompactExercise` is encoded without rendering its text."""
+    encoded = None
+    if compact and isinstance(exercise, CompactExercise):
+        encoded = _encode_compact(exercise.compact_payload, exercise.metadata, exercise.metadata.get("words"))
+    if encoded is not None:
+        payload, metadata = encoded
+    else:
+        text = exercise.render_payload() if isinstance(exercise, CompactExercise) else exercise.payload
+        if compact:
+            payload, metadata = encode_exercise(exercise.type, text, exercise.metadata)
+        else:
+            payload, metadata = text, json.dumps(exercise.metadata)
     cursor = connection.execute(
         """
         INSERT INTO exercises (note_id, type, difficulty, payload, metadata, created_at)
@@ -113,8 +178,8 @@ def insert_exercise(connection: sqlite3.Connection, exercise: Exercise) -> Exerc
             exercise.note_id,
             exercise.type,
             exercise.difficulty,
-            exercise.payload,
-            json.dumps(exercise.metadata),
+            payload,
+            metadata,
             exercise.created_at.isoformat(),
         ),
     )
@@ -132,12 +197,79 @@ def list_notes(connection: sqlite3.Connection) -> list[Note]:
     return [_row_to_note(row) for row in cursor.fetchall()]
 
 
+def migrate_compact_storage(
+    database: Database,
+    compress_threshold: Optional[int] = None,
+    batch_size: int = 500,
+    vacuum: bool = False,
+) -> Dict[str, int]:
+    """Rewrite legacy text exercise payloads into the compact format, one transaction per batch.
+
+    Payloads that would not serialize back to the identical text are left untouched. With a
+    ``compress_threshold``, large note contents are compressed as well. Returns the number of
+    rewritten rows per table; running it again is a no-op.
+    """
+    counts = {"exercises": 0, "notes": 0}
+    last_id = 0
+    while True:
+        with database.session() as connection:
+            rows = connection.execute(
+                """
+                SELECT id, type, payload, metadata FROM exercises
+                WHERE typeof(payload) = 'text' AND id > ? ORDER BY id LIMIT ?
+                """,
+                (last_id, batch_size),
+            ).fetchall()
+            updates = []
+            for row in rows:
+                payload, metadata = encode_exercise(row["type"], row["payload"], json.loads(row["metadata"]))
+                if isinstance(payload, bytes):
+                    updates.append((payload, metadata, row["id"]))
+            connection.executemany("UPDATE exercises SET payload = ?, metadata = ? WHERE id = ?", updates)
+        counts["exercises"] += len(updates)
+        if len(rows) < batch_size:
+            break
+        last_id = rows[-1]["id"]
+
+    last_id = 0
+    while compress_threshold is not None:
+        with database.session() as connection:
+            rows = connection.execute(
+                """
+                SELECT id, content FROM notes
+                WHERE typeof(content) = 'text' AND length(CAST(content AS BLOB)) >= ? AND id > ?
+                ORDER BY id LIMIT ?
+                """,
+                (compress_threshold, last_id, batch_size),
+            ).fetchall()
+            updates = []
+            for row in rows:
+                content = codec.encode_content(row["content"], compress_threshold)
+                if isinstance(content, bytes):
+                    updates.append((content, row["id"]))
+            connection.executemany("UPDATE notes SET content = ? WHERE id = ?", updates)
+        counts["notes"] += len(updates)
+        if len(rows) < batch_size:
+            break
+        last_id = rows[-1]["id"]
+
+    if vacuum:
+        connection = database.connect()
+        try:
+            connection.execute("VACUUM")
+        finally:
+            connection.close()
+    return counts
+
+
 __all__ = [
     "Database",
     "DEFAULT_DB_PATH",
     "init_db",
     "insert_note",
     "insert_exercise",
+    "encode_exercise",
     "list_notes",
     "list_exercises",
+    "migrate_compact_storage",
 ]
@@ -0,0 +1,324 @@
+"""Lightweight counters and latency histograms with Prometheus text export."""
+from __future__ import annotations
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STAGE_DURATION = "tgnotes_stage_duration_seconds"
+STAGE_CALLS = "tgnotes_stage_calls_total"
+SINK_ERRORS = "tgnotes_metrics_sink_errors_total"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+Sink = Callable[[str, str, float, Dict[str, str]], None]
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key)
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str = ""):
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be incremented by non-negative amounts")
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(key)} {_format_value(value)}"
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds, keyed by label values."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts followed by the +Inf bucket, sum and count.
+                series = self._series[key] = [0.0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return int(series[-1]) if series else 0
+
+    def sum(self, **labels: str) -> float:
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return series[-2] if series else 0.0
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in items:
+            cumulative = 0.0
+            for bound, hits in zip(self.buckets + (float("inf"),), series):
+                cumulative += hits
+                labels = _format_labels(key, ("le", _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {_format_value(cumulative)}"
+            yield f"{self.name}_sum{_format_labels(key)} {_format_value(series[-2])}"
+            yield f"{self.name}_count{_format_labels(key)} {_format_value(series[-1])}"
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _StageTimer:
+    __slots__ = ("_registry", "_stage", "_start")
+
+    def __init__(self, registry: "MetricsRegistry", stage: str):
+        self._registry = registry
+        self._stage = stage
+        self._start = 0.0
+
+    def __enter__(self) -> "_StageTimer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        elapsed = time.perf_counter() - self._start
+        self._registry.record_stage(self._stage, elapsed, ok=exc_type is None)
+        return False
+
+
+class MetricsRegistry:
+    """Collection of metrics plus the sinks notified on every observation.
+
+    When the registry is disabled, ``timer`` returns a shared no-op context manager and
+    ``timed`` wrappers call straight through, so instrumented code pays a single attribute check.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._metrics: Dict[str, Counter | Histogram] = {}
+        self._sinks: List[Sink] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str = "") -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, documentation), Counter)
+
+    def histogram(
+        self, name: str, documentation: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(name, documentation, buckets), Histogram)
+
+    def _get_or_create(self, name: str, factory: Callable[[], Any], kind: type) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            elif not isinstance(metric, kind):
+                raise ValueError(f"Metric {name!r} is already registered as a {metric.kind}")
+            return metric
+
+    def add_sink(self, sink: Sink) -> None:
+        """Register ``sink(kind, name, value, labels)`` to receive every recorded observation.
+
+        Exceptions raised by a sink are swallowed and counted in ``tgnotes_metrics_sink_errors_total``.
+        """
+        with self._lock:
+            self._sinks.append(sink)
+
+    def remove_sink(self, sink: Sink) -> None:
+        with self._lock:
+            self._sinks.remove(sink)
+
+    def _emit(self, kind: str, name: str, value: float, labels: Dict[str, str]) -> None:
+        # A failing sink must not change the outcome of the instrumented call, so errors are only counted.
+        for sink in list(self._sinks):
+            try:
+                sink(kind, name, value, labels)
+            except Exception:
+                self.counter(SINK_ERRORS, "Exceptions raised by metric sinks.").inc(
+                    sink=getattr(sink, "__qualname__", type(sink).__qualname__)
+                )
+
+    def record_stage(self, stage: str, seconds: float, ok: bool = True) -> None:
+        if not self.enabled:
+            return
+        outcome = "ok" if ok else "error"
+        self.histogram(STAGE_DURATION, "Wall-clock duration of instrumented stages.").observe(
+            seconds, stage=stage
+        )
+        self.counter(STAGE_CALLS, "Number of calls to instrumented stages.").inc(stage=stage, outcome=outcome)
+        if self._sinks:
+            self._emit("histogram", STAGE_DURATION, seconds, {"stage": stage})
+            self._emit("counter", STAGE_CALLS, 1.0, {"stage": stage, "outcome": outcome})
+
+    def timer(self, stage: str) -> _StageTimer | _NullTimer:
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, stage)
+
+    def timed(self, stage: str) -> Callable[[F], F]:
+        def decorator(func: F) -> F:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _StageTimer(self, stage):
+                    return func(*args, **kwargs)
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorator
+
+    def reset(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines: List[str] = []
+        for metric in metrics:
+            if metric.documentation:
+                lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def write(self, path: str | Path) -> Path:
+        """Atomically write the exposition to ``path`` (e.g. for the node exporter textfile collector)."""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temporary = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        temporary.write_text(self.render(), encoding="utf-8")
+        os.replace(temporary, target)
+        return target
+
+    def serve(self, host: str = "127.0.0.1", port: int = 9464):
+        """Expose ``/metrics`` over HTTP from a daemon thread and return the server.
+
+        Call ``shutdown()`` on the returned server to stop it.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server naming
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:  # pragma: no cover - silence access log
+                pass
+
+        server = ThreadingHTTPServer((host, port), _Handler)
+        thread = threading.Thread(target=server.serve_forever, name="tgnotes-metrics", daemon=True)
+        thread.start()
+        return server
+
+
+REGISTRY = MetricsRegistry(enabled=os.environ.get("TGNOTES_METRICS", "") not in ("", "0"))
+
+
+def enable() -> None:
+    REGISTRY.enabled = True
+
+
+def disable() -> None:
+    REGISTRY.enabled = False
+
+
+def timer(stage: str) -> _StageTimer | _NullTimer:
+    """Context manager timing ``stage`` in the default registry."""
+    return REGISTRY.timer(stage)
+
+
+def timed(stage: str) -> Callable[[F], F]:
+    """Decorator timing every call of the wrapped function as ``stage`` in the default registry."""
+    return REGISTRY.timed(stage)
+
+
+__all__ = [
+    "Counter",
+    "DEFAULT_BUCKETS",
+    "Histogram",
+    "MetricsRegistry",
+    "REGISTRY",
+    "SINK_ERRORS",
+    "STAGE_CALLS",
+    "STAGE_DURATION",
+    "disable",
+    "enable",
+    "timed",
+    "timer",
+]
@@ -3,7 +3,10 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:  # pragma: no cover - static analysis only
+    from .codec import CompactPayload
 
 
 @dataclass(slots=True)
@@ -26,4 +29,38 @@ class Exercise:
     created_at: datetime = field(default_factory=datetime.utcnow)
 
 
-__all__ = ["Note", "Exercise"]
+@dataclass(slots=True)
+class CompactExercise:
+    """An exercise held in its storage form; the text protocol is rendered once, on request.
+
+    Built by :meth:`~tgnotes.services.exercise_generator.ExerciseGenerator.as_compact_model` so that
+    persisting an exercise neither renders its text nor parses it back to find the template.
+    """
+
+    note_id: int
+    type: str
+    difficulty: str
+    compact_payload: CompactPayload
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    id: Optional[int] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    _payload: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def render_payload(self) -> str:
+        if self._payload is None:
+            self._payload = self.compact_payload.serialize()
+        return self._payload
+
+    def to_exercise(self) -> Exercise:
+        return Exercise(
+            note_id=self.note_id,
+            type=self.type,
+            difficulty=self.difficulty,
+            payload=self.render_payload(),
+            metadata=self.metadata,
+            id=self.id,
+            created_at=self.created_at,
+        )
+
+
+__all__ = ["Note", "Exercise", "CompactExercise"]
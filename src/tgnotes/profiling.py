@@ -0,0 +1,268 @@
+"""Opt-in cProfile and tracemalloc capture for individual ingestion runs.
+
+Typical use around the import -> process -> exercise flow::
+
+    profiler = Profiler("profiles", sample_rate=0.01)
+    with profiler.run(label="upload") as run:
+        with run.stage("import"):
+            text = importer.parse(path)
+        with run.stage("process"):
+            processed = pipeline.process(text)
+        with run.stage("persist"):
+            note = notes.create(processed.cleaned, "pdf")
+        run.note_id = note.id
+        with run.stage("exercises"):
+            exercises.create_recall_words(note, processed.lexical_units, "medium")
+
+On Python 3.11 a profiler only sees the thread that enabled it, so code running in worker threads
+is captured only when each worker wraps its work in :meth:`ProfileRun.profile_thread`;
+:class:`~tgnotes.services.ingestion.IngestionService` does this when given a ``profiler``. Work sent
+to other processes is never captured.
+
+Summarise captured runs with ``python -m tgnotes.profiling summarize profiles``.
+"""
+from __future__ import annotations
+
+import argparse
+import cProfile
+import json
+import pstats
+import random
+import shutil
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+RUN_FILE = "run.json"
+PROFILE_FILE = "profile.pstats"
+MEMORY_FILE = "memory.txt"
+
+
+@dataclass(slots=True)
+class ProfileRun:
+    run_id: str
+    label: str
+    profiled: bool
+    note_id: Optional[int] = None
+    note_ids: List[int] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+    path: Optional[Path] = None
+    _thread_profiles: List[cProfile.Profile] = field(default_factory=list, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    @contextmanager
+    def profile_thread(self) -> Iterator[None]:
+        """Profile the calling worker thread for the duration of the block; merged into the run's dump."""
+        if not self.profiled:
+            yield
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # the hook is process-wide here (3.12+) and already owned by the run
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                self._thread_profiles.append(profile)
+
+
+class Profiler:
+    """Capture a cProfile and a tracemalloc top-N snapshot for selected runs.
+
+    A run is captured when ``force=True`` is passed to :meth:`run`, or at random with probability
+    ``sample_rate`` otherwise. The profile covers the thread that entered :meth:`run` plus any worker
+    threads wrapped in :meth:`ProfileRun.profile_thread`. Only one run per process is captured at a
+    time because tracemalloc is process-wide; overlapping runs proceed unprofiled. At most
+    ``max_runs`` run directories are kept in ``output_dir``, the oldest being removed first.
+    """
+
+    def __init__(
+        self,
+        output_dir: str | Path,
+        sample_rate: float = 0.0,
+        max_runs: int = 50,
+        top_n: int = 25,
+        rng: Optional[random.Random] = None,
+    ):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        if max_runs < 1:
+            raise ValueError("max_runs must be at least 1")
+        self.output_dir = Path(output_dir)
+        self.sample_rate = sample_rate
+        self.max_runs = max_runs
+        self.top_n = top_n
+        self._rng = rng or random.Random()
+        self._active = threading.Lock()
+
+    def should_profile(self, force: Optional[bool] = None) -> bool:
+        if force is not None:
+            return force
+        return self.sample_rate > 0 and self._rng.random() < self.sample_rate
+
+    @contextmanager
+    def run(
+        self, label: str = "ingest", note_id: Optional[int] = None, force: Optional[bool] = None
+    ) -> Iterator[ProfileRun]:
+        run_id = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+        if not self.should_profile(force) or not self._active.acquire(blocking=False):
+            yield ProfileRun(run_id=run_id, label=label, profiled=False, note_id=note_id)
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # another profiler (e.g. a coverage tool) owns the hook
+            self._active.release()
+            yield ProfileRun(run_id=run_id, label=label, profiled=False, note_id=note_id)
+            return
+
+        run = ProfileRun(run_id=run_id, label=label, profiled=True, note_id=note_id)
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        else:
+            tracemalloc.reset_peak()
+        error: Optional[str] = None
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+        try:
+            try:
+                yield run
+            finally:
+                profile.disable()
+        except BaseException as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            try:
+                duration = time.perf_counter() - start
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                if started_tracing:
+                    tracemalloc.stop()
+                run.path = self._write(run, profile, snapshot, peak, duration, started_at, error)
+                self._rotate()
+            finally:
+                self._active.release()
+
+    def _write(
+        self,
+        run: ProfileRun,
+        profile: cProfile.Profile,
+        snapshot: tracemalloc.Snapshot,
+        peak: int,
+        duration: float,
+        started_at: datetime,
+        error: Optional[str],
+    ) -> Path:
+        directory = self.output_dir / run.run_id
+        directory.mkdir(parents=True, exist_ok=True)
+        stats = pstats.Stats(profile)
+        with run._lock:
+            for thread_profile in run._thread_profiles:
+                stats.add(thread_profile)
+        stats.dump_stats(directory / PROFILE_FILE)
+
+        snapshot = snapshot.filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            )
+        )
+        statistics = snapshot.statistics("lineno")[: self.top_n]
+        (directory / MEMORY_FILE).write_text("\n".join(str(stat) for stat in statistics) + "\n", encoding="utf-8")
+
+        record = {
+            "run_id": run.run_id,
+            "label": run.label,
+            "note_id": run.note_id,
+            "note_ids": run.note_ids,
+            "started_at": started_at.isoformat(),
+            "duration": duration,
+            "timings": run.timings,
+            "peak_memory": peak,
+            "top_allocations": [
+                {"location": str(stat.traceback[0]), "size": stat.size, "count": stat.count} for stat in statistics
+            ],
+            "error": error,
+        }
+        (directory / RUN_FILE).write_text(json.dumps(record, indent=2), encoding="utf-8")
+        return directory
+
+    def _rotate(self) -> None:
+        runs = sorted(path for path in self.output_dir.iterdir() if (path / RUN_FILE).exists())
+        for stale in runs[: max(0, len(runs) - self.max_runs)]:
+            shutil.rmtree(stale, ignore_errors=True)
+
+
+def load_runs(directory: str | Path) -> List[Dict[str, Any]]:
+    """Return the recorded metadata of every captured run in ``directory``."""
+    runs = []
+    for path in sorted(Path(directory).glob(f"*/{RUN_FILE}")):
+        record = json.loads(path.read_text(encoding="utf-8"))
+        record["path"] = str(path.parent)
+        runs.append(record)
+    return runs
+
+
+def summarize(directory: str | Path, top: int = 5) -> str:
+    runs = load_runs(directory)
+    if not runs:
+        return f"No profiled runs found in {directory}"
+
+    def describe(record: Dict[str, Any]) -> str:
+        stages = ", ".join(f"{name}={seconds:.3f}s" for name, seconds in record["timings"].items())
+        status = f" error={record['error']}" if record.get("error") else ""
+        note_ids = record.get("note_ids") or []
+        notes = f"notes={','.join(map(str, note_ids))}" if note_ids else f"note={record['note_id']}"
+        return (
+            f"  {record['run_id']}  {notes}  {record['duration']:.3f}s  "
+            f"peak={record['peak_memory'] / 1024:.1f} KiB  [{stages}]{status}"
+        )
+
+    slowest = sorted(runs, key=lambda record: record["duration"], reverse=True)[:top]
+    largest = sorted(runs, key=lambda record: record["peak_memory"], reverse=True)[:top]
+    lines = [f"{len(runs)} profiled runs in {directory}", "Slowest runs:"]
+    lines.extend(describe(record) for record in slowest)
+    lines.append("Largest runs by peak traced memory:")
+    lines.extend(describe(record) for record in largest)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m tgnotes.profiling", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    summary = commands.add_parser("summarize", help="List the slowest and largest captured runs.")
+    summary.add_argument("directory", type=Path)
+    summary.add_argument("--top", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(summarize(args.directory, top=args.top))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
+
+
+__all__ = ["Profiler", "ProfileRun", "load_runs", "summarize", "main"]
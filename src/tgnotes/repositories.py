@@ -4,7 +4,7 @@ from __future__ import annotations
 from typing import Iterable, List, Optional
 
 from . import db
-from .models import Exercise, Note
+from .models import CompactExercise, Exercise, Note
 
 
 class NoteRepository:
@@ -15,7 +15,7 @@ class NoteRepository:
         metadata = metadata or {}
         note = Note(content=content, source_type=source_type, metadata=metadata)
         with self._database.session() as connection:
-            note = db.insert_note(connection, note)
+            note = db.insert_note(connection, note, compress_threshold=self._database.compress_threshold)
         return note
 
     def list_all(self) -> List[Note]:
@@ -47,6 +47,11 @@ class ExerciseRepository:
             exercise = db.insert_exercise(connection, exercise)
         return exercise
 
+    def add(self, exercise: Exercise | CompactExercise) -> Exercise | CompactExercise:
+        """Persist an already built exercise, e.g. from :meth:`ExerciseGenerator.as_compact_model`."""
+        with self._database.session() as connection:
+            return db.insert_exercise(connection, exercise)
+
     def list_for_note(self, note_id: int) -> List[Exercise]:
         with self._database.session() as connection:
             return db.list_exercises(connection, note_id)
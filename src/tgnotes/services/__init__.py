@@ -1,17 +1,86 @@
-"""Services offered by the TG Notes toolkit."""
+"""Services offered by the TG Notes toolkit.
+
+Services are imported on first access, so a process that only needs the text pipeline does not
+pay for the importers or their optional backends.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:  # pragma: no cover - static analysis only
+    from .answer_checker import AnswerChecker, AnswerIndex, AnswerMatch
+    from .exercise_generator import ExerciseGenerator, ExercisePayload
+    from .exercise_service import ExerciseService
+    from .ingestion import IngestionItem, IngestionReport, IngestionResult, IngestionService, StageConfig
+    from .ocr_importer import OcrImporter
+    from .pdf_importer import PdfImporter
+    from .pipeline import ProcessedText, TextProcessingPipeline
+    from .text_importer import RawTextNote, TextImporter
+    from .web_importer import WebContent, WebContentImporter
+
+_EXPORTS = {
+    "AnswerChecker": "answer_checker",
+    "AnswerIndex": "answer_checker",
+    "AnswerMatch": "answer_checker",
+    "ExerciseGenerator": "exercise_generator",
+    "ExercisePayload": "exercise_generator",
+    "ExerciseService": "exercise_service",
+    "IngestionItem": "ingestion",
+    "IngestionReport": "ingestion",
+    "IngestionResult": "ingestion",
+    "IngestionService": "ingestion",
+    "StageConfig": "ingestion",
+    "OcrImporter": "ocr_importer",
+    "PdfImporter": "pdf_importer",
+    "ProcessedText": "pipeline",
+    "TextProcessingPipeline": "pipeline",
+    "RawTextNote": "text_importer",
+    "TextImporter": "text_importer",
+    "WebContent": "web_importer",
+    "WebContentImporter": "web_importer",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        return _import_submodule(name)
+    # ``__import__`` (unlike importlib.import_module) is reported by ``python -X importtime``.
+    module = __import__(module_name, globals(), fromlist=[name], level=1)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def _import_submodule(name: str) -> Any:
+    # Submodules were attributes of the eagerly imported package; keep ``package.module`` working.
+    if not name.startswith("_"):
+        try:
+            __import__(f"{__name__}.{name}")
+        except ModuleNotFoundError as exc:
+            if exc.name != f"{__name__}.{name}":
+                raise
+        else:
+            return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *_EXPORTS})
 
-from .exercise_generator import ExerciseGenerator, ExercisePayload
-from .exercise_service import ExerciseService
-from .ocr_importer import OcrImporter
-from .pdf_importer import PdfImporter
-from .pipeline import ProcessedText, TextProcessingPipeline
-from .text_importer import RawTextNote, TextImporter
-from .web_importer import WebContent, WebContentImporter
 
 __all__ = [
+    "AnswerChecker",
+    "AnswerIndex",
+    "AnswerMatch",
     "ExerciseGenerator",
     "ExercisePayload",
     "ExerciseService",
+    "IngestionItem",
+    "IngestionReport",
+    "IngestionResult",
+    "IngestionService",
+    "StageConfig",
     "OcrImporter",
     "PdfImporter",
     "ProcessedText",
@@ -0,0 +1,287 @@
+"""Typed-answer checking for ``recall_words`` exercises.
+
+Accepted answers (``Exercise.metadata["words"]`` plus optional ``metadata["alternates"]``, a mapping
+of word -> an alternative spelling or a list of them) are normalised once and compiled into an :class:`AnswerIndex`:
+a dict for exact hits and a deletion-neighbourhood index (every form with up to two characters
+deleted) that turns a bounded edit-distance lookup into a few dictionary probes. Lookups are cached, so
+re-checking the same input on every keystroke is a dictionary hit.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from ..models import Exercise
+
+_WHITESPACE = re.compile(r"\s+")
+# Quotes and sentence punctuation users commonly type around a single-word answer.
+_EDGE_PUNCTUATION = " \t\n\"'`«»„“”‘’.,!?;:()[]"
+
+
+def normalize(text: str, case_sensitive: bool = False, ignore_accents: bool = False) -> str:
+    """Apply NFKC, trim surrounding punctuation, collapse whitespace and (by default) casefold."""
+    text = unicodedata.normalize("NFKC", text)
+    text = _WHITESPACE.sub(" ", text).strip(_EDGE_PUNCTUATION)
+    if ignore_accents:
+        decomposed = unicodedata.normalize("NFD", text)
+        text = unicodedata.normalize(
+            "NFC", "".join(char for char in decomposed if not unicodedata.combining(char))
+        )
+    return text if case_sensitive else text.casefold()
+
+
+def bounded_levenshtein(source: str, target: str, limit: int) -> int:
+    """Return the edit distance, or ``limit + 1`` as soon as it is known to exceed ``limit``."""
+    if source == target:
+        return 0
+    if abs(len(source) - len(target)) > limit:
+        return limit + 1
+    if len(source) > len(target):
+        source, target = target, source
+    previous = list(range(len(source) + 1))
+    for row, target_char in enumerate(target, start=1):
+        current = [row]
+        best = row
+        for column, source_char in enumerate(source, start=1):
+            value = min(
+                previous[column - 1] + (source_char != target_char),
+                previous[column] + 1,
+                current[column - 1] + 1,
+            )
+            current.append(value)
+            if value < best:
+                best = value
+        if best > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
+def default_tolerance(length: int) -> int:
+    """Edits allowed for an answer of ``length`` characters: none for short words, up to two for long ones."""
+    if length <= 3:
+        return 0
+    if length <= 7:
+        return 1
+    return 2
+
+
+@dataclass(slots=True)
+class AnswerMatch:
+    expected: str
+    accepted: str
+    distance: int
+    case_mismatch: bool = False
+
+    @property
+    def exact(self) -> bool:
+        return self.distance == 0 and not self.case_mismatch
+
+
+@dataclass(slots=True)
+class _Entry:
+    expected: str
+    accepted: str
+    rank: int
+
+
+MAX_INDEXED_DISTANCE = 2
+# Longer input is rejected before normalisation; no vocabulary answer comes close.
+MAX_ANSWER_LENGTH = 256
+
+
+def _alternate_forms(value: str | Iterable[str] | None) -> Tuple[str, ...]:
+    """Alternates for one word: a single spelling (``{"colour": "color"}``) or a list of them."""
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    return tuple(value)
+
+
+def _deletions(term: str, depth: int) -> Set[str]:
+    """Every string obtained from ``term`` by deleting at most ``depth`` characters."""
+    variants = {term}
+    frontier = {term}
+    for _ in range(depth):
+        frontier = {variant[:i] + variant[i + 1 :] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+
+class _DeletionIndex:
+    """Strings within edit distance ``d`` share a variant reachable by at most ``d`` deletions from each."""
+
+    def __init__(self) -> None:
+        self._variants: Dict[str, List[Tuple[str, _Entry]]] = {}
+        self._terms: List[Tuple[str, _Entry]] = []
+
+    def add(self, term: str, entry: _Entry) -> None:
+        self._terms.append((term, entry))
+        for variant in _deletions(term, MAX_INDEXED_DISTANCE):
+            self._variants.setdefault(variant, []).append((term, entry))
+
+    def search(self, query: str, max_distance: int) -> List[Tuple[int, _Entry]]:
+        if max_distance > MAX_INDEXED_DISTANCE:
+            candidates = self._terms
+        else:
+            seen: Dict[str, _Entry] = {}
+            for variant in _deletions(query, max_distance):
+                for term, entry in self._variants.get(variant, ()):
+                    seen.setdefault(term, entry)
+            candidates = list(seen.items())
+        found = []
+        for term, entry in candidates:
+            distance = bounded_levenshtein(query, term, max_distance)
+            if distance <= max_distance:
+                found.append((distance, entry))
+        return found
+
+
+class AnswerIndex:
+    """Accepted answers for one exercise, precompiled for exact and fuzzy lookups."""
+
+    def __init__(
+        self,
+        words: Sequence[str],
+        alternates: Optional[Mapping[str, str | Iterable[str]]] = None,
+        case_sensitive: bool = False,
+        ignore_accents: bool = False,
+        cache_size: int = 256,
+    ):
+        self._case_sensitive = case_sensitive
+        self._ignore_accents = ignore_accents
+        self._exact: Dict[str, _Entry] = {}
+        self._by_expected: Dict[str, List[Tuple[str, _Entry]]] = {}
+        self._fuzzy = _DeletionIndex()
+        self._min_length = self._max_length = 0
+        alternates = alternates or {}
+        for word in words:
+            for form in (word, *_alternate_forms(alternates.get(word))):
+                self._add(word, form)
+        self._lookup = lru_cache(maxsize=cache_size)(self._search)
+
+    def _normalize(self, text: str) -> str:
+        return normalize(text, self._case_sensitive, self._ignore_accents)
+
+    def _add(self, expected: str, form: str) -> None:
+        key = self._normalize(form)
+        if not key:
+            return
+        entry = _Entry(expected=expected, accepted=form, rank=len(self._exact))
+        forms = self._by_expected.setdefault(expected, [])
+        if any(existing == key for existing, _ in forms):
+            return
+        forms.append((key, entry))
+        if key not in self._exact:
+            if self._exact:
+                self._min_length = min(self._min_length, len(key))
+                self._max_length = max(self._max_length, len(key))
+            else:
+                self._min_length = self._max_length = len(key)
+            self._exact[key] = entry
+            self._fuzzy.add(key, entry)
+
+    @property
+    def words(self) -> List[str]:
+        return list(self._by_expected)
+
+    def match(
+        self, answer: str, expected: Optional[str] = None, max_distance: Optional[int] = None
+    ) -> Optional[AnswerMatch]:
+        """Return the closest accepted answer within tolerance, or ``None``.
+
+        With ``expected``, only that word and its alternates are considered (checking one blank);
+        otherwise any word of the exercise may match. ``max_distance`` defaults to
+        :func:`default_tolerance` of the normalised answer length. Answers longer than
+        ``MAX_ANSWER_LENGTH`` characters never match.
+        """
+        if len(answer) > MAX_ANSWER_LENGTH:
+            return None
+        return self._lookup(answer, expected, max_distance)
+
+    def _search(self, answer: str, expected: Optional[str], max_distance: Optional[int]) -> Optional[AnswerMatch]:
+        key = self._normalize(answer)
+        if not key:
+            return None
+        limit = default_tolerance(len(key)) if max_distance is None else max_distance
+        # Every edit changes the length by at most one, so this skips the deletion probes entirely.
+        if not self._exact or not self._min_length - limit <= len(key) <= self._max_length + limit:
+            return None
+
+        best: Optional[Tuple[int, _Entry]] = None
+        if expected is not None:
+            for form, entry in self._by_expected.get(expected, ()):
+                distance = bounded_levenshtein(key, form, limit)
+                if distance <= limit and (best is None or distance < best[0]):
+                    best = (distance, entry)
+        else:
+            entry = self._exact.get(key)
+            if entry is not None:
+                best = (0, entry)
+            else:
+                # Ties go to the word listed first in the exercise.
+                candidates = self._fuzzy.search(key, limit)
+                if candidates:
+                    best = min(candidates, key=lambda candidate: (candidate[0], candidate[1].rank))
+        if best is None:
+            return None
+
+        distance, entry = best
+        case_mismatch = False
+        if distance == 0 and not self._case_sensitive:
+            case_mismatch = normalize(answer, True, self._ignore_accents) != normalize(
+                entry.accepted, True, self._ignore_accents
+            )
+        return AnswerMatch(expected=entry.expected, accepted=entry.accepted, distance=distance, case_mismatch=case_mismatch)
+
+
+class AnswerChecker:
+    """Check typed answers against exercises, keeping compiled indexes for recently used exercises."""
+
+    def __init__(self, case_sensitive: bool = False, ignore_accents: bool = False, max_indexes: int = 1024):
+        self._case_sensitive = case_sensitive
+        self._ignore_accents = ignore_accents
+        self._max_indexes = max_indexes
+        self._indexes: "OrderedDict[tuple, AnswerIndex]" = OrderedDict()
+
+    def index_for(self, exercise: Exercise) -> AnswerIndex:
+        words = tuple(exercise.metadata.get("words", ()))
+        alternates = exercise.metadata.get("alternates") or {}
+        key = (
+            exercise.id,
+            words,
+            tuple(sorted((word, _alternate_forms(forms)) for word, forms in alternates.items())),
+        )
+        index = self._indexes.get(key)
+        if index is not None:
+            self._indexes.move_to_end(key)
+            return index
+        index = AnswerIndex(words, alternates, self._case_sensitive, self._ignore_accents)
+        self._indexes[key] = index
+        if len(self._indexes) > self._max_indexes:
+            self._indexes.popitem(last=False)
+        return index
+
+    def check(
+        self,
+        exercise: Exercise,
+        answer: str,
+        expected: Optional[str] = None,
+        max_distance: Optional[int] = None,
+    ) -> Optional[AnswerMatch]:
+        return self.index_for(exercise).match(answer, expected=expected, max_distance=max_distance)
+
+
+__all__ = [
+    "AnswerChecker",
+    "AnswerIndex",
+    "AnswerMatch",
+    "bounded_levenshtein",
+    "default_tolerance",
+    "normalize",
+]
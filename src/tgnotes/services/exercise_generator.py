@@ -5,7 +5,8 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Sequence
 
-from ..models import Exercise, Note
+from ..codec import TEMPLATE_FOR_TYPE, TEMPLATES, CompactPayload
+from ..models import CompactExercise, Exercise, Note
 
 
 @dataclass(slots=True)
@@ -18,6 +19,10 @@ class ExercisePayload:
         header = f"type: {self.type}\nwords: {', '.join(self.words)}\nexercise_start"
         return f"{header}\n{self.body.strip()}\nexercise_end"
 
+    def to_compact(self) -> CompactPayload:
+        """Return the storage form: the words once plus a template id instead of repeated sentences."""
+        return CompactPayload.from_parts(self.type, self.words, self.body)
+
 
 class ExerciseGenerator:
     """Generate exercises based on lexical units."""
@@ -34,14 +39,16 @@ class ExerciseGenerator:
         words = self._select_words(lexical_units)
         if len(words) < self._min_words:
             raise ValueError("Not enough lexical units to generate move_words exercise")
-        body_lines = [f"- Move the word '{word}' into a meaningful sentence." for word in words]
+        template = TEMPLATES[TEMPLATE_FOR_TYPE["move_words"]]
+        body_lines = [template.format(word=word) for word in words]
         return ExercisePayload(type="move_words", words=words, body="\n".join(body_lines))
 
     def generate_recall_words(self, lexical_units: Sequence[str]) -> ExercisePayload:
         words = self._select_words(lexical_units)
         if len(words) < self._min_words:
             raise ValueError("Not enough lexical units to generate recall_words exercise")
-        body_lines = [f"- Recall a definition or usage example for '{word}'." for word in words]
+        template = TEMPLATES[TEMPLATE_FOR_TYPE["recall_words"]]
+        body_lines = [template.format(word=word) for word in words]
         return ExercisePayload(type="recall_words", words=words, body="\n".join(body_lines))
 
     def as_model(
@@ -51,21 +58,44 @@ class ExerciseGenerator:
         difficulty: str,
         metadata: dict | None = None,
     ) -> Exercise:
+        return Exercise(
+            note_id=self._note_id(note),
+            type=payload.type,
+            difficulty=difficulty,
+            payload=payload.serialize(),
+            metadata=self._combined_metadata(payload, metadata),
+        )
+
+    def as_compact_model(
+        self,
+        note: Note,
+        payload: ExercisePayload,
+        difficulty: str,
+        metadata: dict | None = None,
+    ) -> CompactExercise:
+        """Like :meth:`as_model`, but keep the storage form and render the text only on request."""
+        return CompactExercise(
+            note_id=self._note_id(note),
+            type=payload.type,
+            difficulty=difficulty,
+            compact_payload=payload.to_compact(),
+            metadata=self._combined_metadata(payload, metadata),
+        )
+
+    @staticmethod
+    def _note_id(note: Note) -> int:
         if note.id is None:
             raise ValueError("Note must be persisted before generating exercises")
+        return note.id
+
+    @staticmethod
+    def _combined_metadata(payload: ExercisePayload, metadata: dict | None) -> dict:
         metadata = metadata or {}
-        combined_metadata = {
+        return {
             **metadata,
             "words": payload.words,
             "generated_at": datetime.utcnow().isoformat(),
         }
-        return Exercise(
-            note_id=note.id,
-            type=payload.type,
-            difficulty=difficulty,
-            payload=payload.serialize(),
-            metadata=combined_metadata,
-        )
 
 
 __all__ = ["ExerciseGenerator", "ExercisePayload"]
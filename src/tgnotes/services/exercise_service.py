@@ -23,14 +23,8 @@ class ExerciseService:
         metadata: Optional[dict] = None,
     ):
         payload = self._generator.generate_move_words(list(lexical_units))
-        model = self._generator.as_model(note, payload, difficulty, metadata)
-        return self._repository.create(
-            note_id=model.note_id,
-            exercise_type=model.type,
-            difficulty=model.difficulty,
-            payload=model.payload,
-            metadata=model.metadata,
-        )
+        model = self._generator.as_compact_model(note, payload, difficulty, metadata)
+        return self._repository.add(model).to_exercise()
 
     def create_recall_words(
         self,
@@ -40,14 +34,8 @@ class ExerciseService:
         metadata: Optional[dict] = None,
     ):
         payload = self._generator.generate_recall_words(list(lexical_units))
-        model = self._generator.as_model(note, payload, difficulty, metadata)
-        return self._repository.create(
-            note_id=model.note_id,
-            exercise_type=model.type,
-            difficulty=model.difficulty,
-            payload=model.payload,
-            metadata=model.metadata,
-        )
+        model = self._generator.as_compact_model(note, payload, difficulty, metadata)
+        return self._repository.add(model).to_exercise()
 
 
 __all__ = ["ExerciseService"]
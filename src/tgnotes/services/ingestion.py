@@ -0,0 +1,399 @@
+"""Staged ingestion: fetch/parse -> process -> persist -> generate exercises."""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .. import metrics
+from ..models import Exercise, Note
+from ..repositories import NoteRepository
+from .exercise_service import ExerciseService
+from .ocr_importer import OcrImporter
+from .pdf_importer import PdfImporter
+from .pipeline import ProcessedText, TextProcessingPipeline
+from .text_importer import TextImporter
+from .web_importer import WebContentImporter
+
+if TYPE_CHECKING:
+    from ..profiling import Profiler, ProfileRun
+
+IMAGE_SUFFIXES = frozenset({".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tif", ".tiff", ".webp"})
+TEXT_SUFFIXES = frozenset({".txt", ".md"})
+STAGES = ("fetch", "process", "persist", "generate")
+
+_STOP = object()
+
+
+@dataclass(slots=True)
+class IngestionItem:
+    """A single source to ingest.
+
+    ``kind`` is one of ``pdf``, ``image``, ``url`` or ``text``; when omitted it is inferred from the
+    source (``http(s)://`` strings are URLs, paths are classified by suffix, other strings are raw text).
+    Strings are never looked up on disk: pass a :class:`~pathlib.Path` or an explicit ``kind`` to
+    ingest a file.
+    """
+
+    source: str | Path
+    kind: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    notion_api_token: Optional[str] = None
+
+    def resolved_kind(self) -> str:
+        if self.kind is not None:
+            return self.kind
+        if isinstance(self.source, Path):
+            suffix = self.source.suffix.lower()
+            if suffix == ".pdf":
+                return "pdf"
+            if suffix in IMAGE_SUFFIXES:
+                return "image"
+            if suffix in TEXT_SUFFIXES:
+                return "text"
+            raise ValueError(f"Cannot infer the source kind of {self.source}")
+        if self.source.startswith(("http://", "https://")):
+            return "url"
+        return "text"
+
+
+@dataclass(slots=True)
+class IngestionResult:
+    index: int
+    item: IngestionItem
+    note: Optional[Note] = None
+    exercises: List[Exercise] = field(default_factory=list)
+    error: Optional[str] = None
+    failed_stage: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass(slots=True)
+class StageConfig:
+    """Worker pool settings for one stage.
+
+    ``executor`` is ``"thread"`` (suited to I/O-bound stages) or ``"process"`` (CPU-bound stages;
+    the stage's callable and its arguments must then be picklable). ``queue_size`` bounds the
+    stage's input queue, so a slow stage blocks its producers instead of buffering without limit.
+    """
+
+    workers: int = 1
+    executor: str = "thread"
+    queue_size: int = 16
+
+    def __post_init__(self) -> None:
+        if self.workers < 1:
+            raise ValueError("A stage needs at least one worker")
+        if self.queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        if self.executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor {self.executor!r}")
+
+
+@dataclass(slots=True)
+class StageStats:
+    name: str
+    workers: int
+    executor: str
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Items successfully handled per second of wall-clock time."""
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+
+@dataclass(slots=True)
+class IngestionReport:
+    results: List[IngestionResult]
+    stages: Dict[str, StageStats]
+    elapsed: float
+
+    @property
+    def succeeded(self) -> List[IngestionResult]:
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> List[IngestionResult]:
+        return [result for result in self.results if not result.ok]
+
+
+@dataclass(slots=True)
+class _Job:
+    result: IngestionResult
+    processed: Optional[ProcessedText] = None
+    value: Any = None
+
+
+class _StageRunner:
+    def __init__(
+        self,
+        name: str,
+        config: StageConfig,
+        compute: Callable[..., Any],
+        arguments: Callable[[_Job], Tuple[Any, ...]],
+        apply: Callable[[_Job, Any], None],
+        inbox: queue.Queue,
+        outbox: Optional[queue.Queue],
+        downstream_workers: int,
+        profile_run: Optional[ProfileRun] = None,
+    ):
+        self.name = name
+        self.stats = StageStats(name=name, workers=config.workers, executor=config.executor)
+        self._compute = compute
+        self._arguments = arguments
+        self._apply = apply
+        self._inbox = inbox
+        self._outbox = outbox
+        self._downstream_workers = downstream_workers
+        self._profile_run = profile_run
+        self._pool: Optional[Executor] = None
+        if config.executor == "process":
+            self._pool = ProcessPoolExecutor(max_workers=config.workers)
+        self._lock = threading.Lock()
+        self._running = config.workers
+        self._threads = [
+            threading.Thread(target=self._work, name=f"ingestion-{name}-{number}", daemon=True)
+            for number in range(config.workers)
+        ]
+
+    def start(self) -> None:
+        for thread in self._threads:
+            thread.start()
+
+    def join(self) -> None:
+        for thread in self._threads:
+            thread.join()
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def _call(self, *args: Any) -> Any:
+        if self._pool is None:
+            return self._compute(*args)
+        return self._pool.submit(self._compute, *args).result()
+
+    def _work(self) -> None:
+        with self._profile_run.profile_thread() if self._profile_run is not None else nullcontext():
+            self._drain()
+
+        with self._lock:
+            self._running -= 1
+            last = self._running == 0
+        if last and self._outbox is not None:
+            for _ in range(self._downstream_workers):
+                self._outbox.put(_STOP)
+
+    def _drain(self) -> None:
+        while True:
+            job = self._inbox.get()
+            if job is _STOP:
+                break
+            start = time.perf_counter()
+            try:
+                with metrics.timer(f"ingestion.{self.name}"):
+                    self._apply(job, self._call(*self._arguments(job)))
+            except Exception as exc:
+                job.result.error = f"{type(exc).__name__}: {exc}"
+                job.result.failed_stage = self.name
+            busy = time.perf_counter() - start
+            with self._lock:
+                self.stats.busy_seconds += busy
+                if job.result.ok:
+                    self.stats.processed += 1
+                else:
+                    self.stats.failed += 1
+            if job.result.ok and self._outbox is not None:
+                self._outbox.put(job)
+
+
+class IngestionService:
+    """Run importers, the text pipeline, persistence and exercise generation as concurrent stages.
+
+    Each stage has its own worker pool and a bounded input queue. A failure is recorded on the
+    offending item's :class:`IngestionResult` and the item leaves the flow; other items carry on.
+    With a ``profiler``, each :meth:`ingest` call is a candidate :class:`~tgnotes.profiling.Profiler`
+    run covering every thread-pool worker; stages with a process executor are not profiled.
+    """
+
+    def __init__(
+        self,
+        note_repository: NoteRepository,
+        exercise_service: ExerciseService,
+        pipeline: Optional[TextProcessingPipeline] = None,
+        pdf_importer: Optional[PdfImporter] = None,
+        ocr_importer: Optional[OcrImporter] = None,
+        web_importer: Optional[WebContentImporter] = None,
+        text_importer: Optional[TextImporter] = None,
+        fetch: Optional[StageConfig] = None,
+        process: Optional[StageConfig] = None,
+        persist: Optional[StageConfig] = None,
+        generate: Optional[StageConfig] = None,
+        exercise_types: Sequence[str] = ("move_words", "recall_words"),
+        difficulty: str = "medium",
+        profiler: Optional[Profiler] = None,
+    ):
+        unknown = set(exercise_types) - {"move_words", "recall_words"}
+        if unknown:
+            raise ValueError(f"Unsupported exercise types: {sorted(unknown)}")
+        self._notes = note_repository
+        self._exercises = exercise_service
+        self._pipeline = pipeline or TextProcessingPipeline()
+        self._pdf_importer = pdf_importer or PdfImporter()
+        self._ocr_importer = ocr_importer
+        self._web_importer = web_importer or WebContentImporter()
+        self._text_importer = text_importer or TextImporter()
+        self._configs = {
+            "fetch": fetch or StageConfig(workers=4),
+            "process": process or StageConfig(workers=2),
+            # SQLite serialises writers, so extra persist workers only add lock contention.
+            "persist": persist or StageConfig(workers=1),
+            "generate": generate or StageConfig(workers=2),
+        }
+        self._exercise_types = tuple(exercise_types)
+        self._difficulty = difficulty
+        self._profiler = profiler
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Process-executor stages pickle bound methods, and with them the service; the profiler
+        # holds locks and only matters in the parent process.
+        state = self.__dict__.copy()
+        state["_profiler"] = None
+        return state
+
+    def ingest(self, items: Iterable[IngestionItem | str | Path]) -> IngestionReport:
+        """Ingest a mixed batch of PDFs, images, URLs and raw text; results keep input order."""
+        if self._profiler is None:
+            return self._ingest(items, None)
+        with self._profiler.run(label="ingest") as run:
+            report = self._ingest(items, run)
+            for name, stats in report.stages.items():
+                run.timings[name] = stats.busy_seconds
+            run.note_ids = [result.note.id for result in report.results if result.note is not None]
+            return report
+
+    def _ingest(self, items: Iterable[IngestionItem | str | Path], profile_run: Optional[ProfileRun]) -> IngestionReport:
+        queues = {name: queue.Queue(maxsize=self._configs[name].queue_size) for name in STAGES}
+        wiring = {
+            "fetch": (self._load, lambda job: (job.result.item,), self._apply_text),
+            "process": (self._pipeline.process, lambda job: (job.value,), self._apply_processed),
+            "persist": (self._persist, lambda job: (job.result.item, job.processed), self._apply_note),
+            "generate": (self._generate, lambda job: (job.result.note, job.processed), self._apply_exercises),
+        }
+        runners = []
+        for position, name in enumerate(STAGES):
+            downstream = STAGES[position + 1] if position + 1 < len(STAGES) else None
+            compute, arguments, apply = wiring[name]
+            runners.append(
+                _StageRunner(
+                    name,
+                    self._configs[name],
+                    compute,
+                    arguments,
+                    apply,
+                    inbox=queues[name],
+                    outbox=queues[downstream] if downstream else None,
+                    downstream_workers=self._configs[downstream].workers if downstream else 0,
+                    profile_run=profile_run,
+                )
+            )
+
+        results: List[IngestionResult] = []
+        start = time.perf_counter()
+        for runner in runners:
+            runner.start()
+        try:
+            for index, item in enumerate(items):
+                if not isinstance(item, IngestionItem):
+                    item = IngestionItem(source=item)
+                result = IngestionResult(index=index, item=item)
+                results.append(result)
+                queues["fetch"].put(_Job(result=result))
+        finally:
+            for _ in range(self._configs["fetch"].workers):
+                queues["fetch"].put(_STOP)
+            for runner in runners:
+                runner.join()
+        elapsed = time.perf_counter() - start
+
+        stages = {}
+        for runner in runners:
+            runner.stats.elapsed = elapsed
+            stages[runner.name] = runner.stats
+        return IngestionReport(results=results, stages=stages, elapsed=elapsed)
+
+    def _load(self, item: IngestionItem) -> str:
+        kind = item.resolved_kind()
+        if kind == "pdf":
+            return self._pdf_importer.parse(item.source)
+        if kind == "image":
+            return (self._ocr_importer or OcrImporter()).parse(item.source)
+        if kind == "url":
+            return self._web_importer.fetch(str(item.source), item.notion_api_token).text
+        if kind == "text":
+            if isinstance(item.source, Path):
+                return item.source.read_text(encoding="utf-8")
+            return self._text_importer.parse(item.source).content
+        raise ValueError(f"Unknown source kind {kind!r}")
+
+    def _persist(self, item: IngestionItem, processed: ProcessedText) -> Note:
+        kind = item.resolved_kind()
+        if kind == "pdf":
+            source_type, metadata = "pdf", {"path": str(item.source)}
+        elif kind == "image":
+            source_type, metadata = "image", {"file": str(item.source)}
+        elif kind == "url":
+            source_type = "notion" if item.notion_api_token else "web"
+            metadata = {"url": str(item.source)}
+        else:
+            source_type, metadata = "raw", {}
+        metadata.update(item.metadata)
+        metadata.setdefault("language", processed.language)
+        return self._notes.create(content=processed.cleaned, source_type=source_type, metadata=metadata)
+
+    def _generate(self, note: Note, processed: ProcessedText) -> List[Exercise]:
+        created = []
+        for exercise_type in self._exercise_types:
+            if exercise_type == "move_words":
+                create = self._exercises.create_move_words
+            else:
+                create = self._exercises.create_recall_words
+            created.append(create(note, processed.lexical_units, difficulty=self._difficulty))
+        return created
+
+    @staticmethod
+    def _apply_text(job: _Job, text: str) -> None:
+        job.value = text
+
+    @staticmethod
+    def _apply_processed(job: _Job, processed: ProcessedText) -> None:
+        job.processed = processed
+        job.value = None
+
+    @staticmethod
+    def _apply_note(job: _Job, note: Note) -> None:
+        job.result.note = note
+
+    @staticmethod
+    def _apply_exercises(job: _Job, exercises: List[Exercise]) -> None:
+        job.result.exercises = exercises
+
+
+__all__ = [
+    "IngestionItem",
+    "IngestionReport",
+    "IngestionResult",
+    "IngestionService",
+    "StageConfig",
+    "StageStats",
+]
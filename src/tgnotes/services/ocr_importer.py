@@ -1,18 +1,43 @@
 """OCR importing service."""
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Protocol
+from typing import Any, Callable, Optional, Protocol
 
-try:  # pragma: no cover - optional dependency
-    from PIL import Image  # type: ignore
-except Exception:  # pragma: no cover
-    Image = None  # type: ignore
+from .. import metrics
 
-try:  # pragma: no cover - optional dependency
-    import pytesseract  # type: ignore
-except Exception:  # pragma: no cover
-    pytesseract = None  # type: ignore
+
+@lru_cache(maxsize=None)
+def _load_pil_image() -> Optional[Any]:
+    try:  # pragma: no cover - optional dependency
+        from PIL import Image  # type: ignore
+    except Exception:  # pragma: no cover
+        return None
+    return Image
+
+
+@lru_cache(maxsize=None)
+def _load_pytesseract() -> Optional[Any]:
+    try:  # pragma: no cover - optional dependency
+        import pytesseract  # type: ignore
+    except Exception:  # pragma: no cover
+        return None
+    return pytesseract
+
+
+def __getattr__(name: str) -> Any:
+    # ``Image`` and ``pytesseract`` used to be module attributes; resolve them on demand.
+    if name == "Image":
+        return _load_pil_image()
+    if name == "pytesseract":
+        return _load_pytesseract()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _backend(name: str, loader: Callable[[], Optional[Any]]) -> Optional[Any]:
+    # A module attribute assigned by the caller (e.g. ``ocr_importer.pytesseract = fake``) wins.
+    return globals()[name] if name in globals() else loader()
 
 
 class OcrEngine(Protocol):
@@ -24,21 +49,23 @@ class OcrImporter:
     """Extract text from images using OCR."""
 
     def __init__(self, engine: Optional[OcrEngine] = None):
-        self._engine = engine or pytesseract
+        self._engine = engine or _backend("pytesseract", _load_pytesseract)
         if self._engine is None:
             raise RuntimeError("An OCR engine such as pytesseract is required for OCR support.")
 
+    @metrics.timed("ocr_import.parse")
     def parse(self, image_path: str | Path) -> str:
         path = Path(image_path)
         if not path.exists():
             raise FileNotFoundError(path)
 
-        if Image is None:
+        image_module = _backend("Image", _load_pil_image)
+        if image_module is None:
             with path.open("rb") as binary:
                 data = binary.read()
             text = self._engine.image_to_string(data)  # type: ignore[arg-type]
         else:
-            with Image.open(path) as image:  # type: ignore[call-arg]
+            with image_module.open(path) as image:  # type: ignore[call-arg]
                 text = self._engine.image_to_string(image)  # type: ignore[call-arg]
         return text.strip()
 
@@ -1,23 +1,44 @@
 """PDF importing service."""
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
-try:
-    import pdfplumber  # type: ignore
-except Exception:  # pragma: no cover - graceful fallback when dependency missing
-    pdfplumber = None  # type: ignore
+from .. import metrics
+
+
+@lru_cache(maxsize=None)
+def _load_pdfplumber() -> Optional[Any]:
+    try:
+        import pdfplumber  # type: ignore
+    except Exception:  # pragma: no cover - graceful fallback when dependency missing
+        return None
+    return pdfplumber
+
+
+def __getattr__(name: str) -> Any:
+    # ``pdfplumber`` used to be a module attribute; keep it reachable without importing eagerly.
+    if name == "pdfplumber":
+        return _load_pdfplumber()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _pdfplumber() -> Optional[Any]:
+    # A module attribute assigned by the caller (e.g. ``pdf_importer.pdfplumber = fake``) wins.
+    return globals()["pdfplumber"] if "pdfplumber" in globals() else _load_pdfplumber()
 
 
 class PdfImporter:
     """Extract text from PDF documents."""
 
     def __init__(self, backend: Optional[object] = None):
-        self._backend = backend or pdfplumber
+        self._backend = backend
 
+    @metrics.timed("pdf_import.parse")
     def parse(self, pdf_path: str | Path) -> str:
-        if self._backend is None:
+        backend = self._backend or _pdfplumber()
+        if backend is None:
             raise RuntimeError("pdfplumber is required to parse PDF files.")
 
         path = Path(pdf_path)
@@ -25,7 +46,7 @@ class PdfImporter:
             raise FileNotFoundError(path)
 
         texts: list[str] = []
-        with self._backend.open(path) as pdf:  # type: ignore[attr-defined]
+        with backend.open(path) as pdf:  # type: ignore[attr-defined]
             for page in pdf.pages:
                 page_text = page.extract_text() or ""
                 texts.append(page_text.strip())
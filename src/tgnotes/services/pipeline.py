@@ -5,6 +5,8 @@ import re
 from dataclasses import dataclass
 from typing import Iterable, List
 
+from .. import metrics
+
 
 @dataclass(slots=True)
 class ProcessedText:
@@ -40,6 +42,7 @@ class TextProcessingPipeline:
                 lexical_units.append(token)
         return lexical_units
 
+    @metrics.timed("pipeline.process")
     def process(self, text: str) -> ProcessedText:
         cleaned = self.clean(text)
         language = self.detect_language(cleaned)
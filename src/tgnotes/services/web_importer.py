@@ -4,7 +4,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from html.parser import HTMLParser
 from typing import Callable, Optional
-from urllib.request import Request, urlopen
+
+from .. import metrics
 
 
 @dataclass(slots=True)
@@ -35,9 +36,11 @@ class WebContentImporter:
 
     def __init__(self, fetcher: Optional[Callable[[str, Optional[str]], str]] = None):
         self._fetcher = fetcher or self._default_fetch
-        self._parser = _TextExtractor()
 
     def _default_fetch(self, url: str, notion_api_token: Optional[str] = None) -> str:
+        # urllib.request pulls in http.client, email and ssl; only pay for it when actually fetching.
+        from urllib.request import Request, urlopen
+
         request = Request(url)
         if notion_api_token:
             request.add_header("Authorization", f"Bearer {notion_api_token}")
@@ -46,9 +49,11 @@ class WebContentImporter:
             charset = response.headers.get_content_charset() or "utf-8"
             return response.read().decode(charset)
 
+    @metrics.timed("web_import.fetch")
     def fetch(self, url: str, notion_api_token: Optional[str] = None) -> WebContent:
         html = self._fetcher(url, notion_api_token)
-        text = self._parser.extract(html)
+        # A fresh parser per call keeps the importer safe to share between worker threads.
+        text = _TextExtractor().extract(html)
         return WebContent(url=url, raw_html=html, text=text)
 
 
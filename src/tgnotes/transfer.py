@@ -0,0 +1,361 @@
+"""Streaming bulk export and import of notes and exercises.
+
+Records are written one JSON object per line (NDJSON) with ``"table"`` set to ``notes`` or
+``exercises``; the ``columnar`` format instead writes one line per chunk holding a column -> values
+mapping. Exercise payloads are exported as the text protocol with ``metadata["words"]`` restored,
+so dumps do not depend on the storage format. Paths ending in ``.gz`` are gzip-compressed.
+
+Usage::
+
+    python -m tgnotes.transfer export app.db backup.ndjson.gz
+    python -m tgnotes.transfer import other.db backup.ndjson.gz
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from json.encoder import encode_basestring as _dump_string  # type: ignore[attr-defined]
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from . import codec, db
+
+FORMATS = ("ndjson", "columnar")
+TABLES = ("notes", "exercises")
+NOTE_COLUMNS = ("id", "content", "source_type", "metadata", "created_at")
+EXERCISE_COLUMNS = ("id", "note_id", "type", "difficulty", "payload", "metadata", "created_at")
+DEFAULT_CHUNK_SIZE = 5000
+# About 10 MiB of dict entries; larger imports spill the note id mapping to a temporary table.
+DEFAULT_MAX_MAPPED_NOTES = 100_000
+_NOTE_IDS = "temp.transfer_note_ids"
+
+_decode = json.JSONDecoder().decode
+
+
+@dataclass(slots=True)
+class ImportResult:
+    """Imported row counts; ``note_ids`` (exported -> new id) is filled only when requested."""
+
+    notes: int = 0
+    exercises: int = 0
+    note_ids: Dict[int, int] = field(default_factory=dict)
+
+
+def _with_words(metadata: str, words: Optional[List[str]]) -> str:
+    """Splice ``"words"`` into a metadata JSON object without decoding it."""
+    if words is None:
+        return metadata
+    encoded = json.dumps(words)
+    if metadata.rstrip() == "{}":
+        return f'{{"words": {encoded}}}'
+    return f'{metadata.rstrip()[:-1]}, "words": {encoded}}}'
+
+
+def _note_rows(connection: sqlite3.Connection, chunk_size: int) -> Iterator[List[Tuple[Any, ...]]]:
+    cursor = connection.execute(f"SELECT {', '.join(NOTE_COLUMNS)} FROM notes ORDER BY id")
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield [
+            (note_id, codec.decode_content(content), source_type, metadata, created_at)
+            for note_id, content, source_type, metadata, created_at in rows
+        ]
+
+
+def _exercise_rows(connection: sqlite3.Connection, chunk_size: int) -> Iterator[List[Tuple[Any, ...]]]:
+    cursor = connection.execute(f"SELECT {', '.join(EXERCISE_COLUMNS)} FROM exercises ORDER BY id")
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        decoded = []
+        for exercise_id, note_id, exercise_type, difficulty, payload, metadata, created_at in rows:
+            if isinstance(payload, bytes):
+                payload, words = codec.decode_text(exercise_type, payload)
+                metadata = _with_words(metadata, words)
+            decoded.append((exercise_id, note_id, exercise_type, difficulty, payload, metadata, created_at))
+        yield decoded
+
+
+def _ndjson_lines(table: str, rows: Sequence[Tuple[Any, ...]]) -> str:
+    # Metadata is already JSON in the database, so lines are assembled rather than re-encoded.
+    if table == "notes":
+        return "".join(
+            f'{{"table": "notes", "id": {note_id}, "content": {_dump_string(content)}, '
+            f'"source_type": {_dump_string(source_type)}, "metadata": {metadata}, '
+            f'"created_at": {_dump_string(created_at)}}}\n'
+            for note_id, content, source_type, metadata, created_at in rows
+        )
+    return "".join(
+        f'{{"table": "exercises", "id": {exercise_id}, "note_id": {note_id}, "type": {_dump_string(kind)}, '
+        f'"difficulty": {_dump_string(difficulty)}, "payload": {_dump_string(payload)}, '
+        f'"metadata": {metadata}, "created_at": {_dump_string(created_at)}}}\n'
+        for exercise_id, note_id, kind, difficulty, payload, metadata, created_at in rows
+    )
+
+
+def _columnar_line(table: str, rows: Sequence[Tuple[Any, ...]]) -> str:
+    names = NOTE_COLUMNS if table == "notes" else EXERCISE_COLUMNS
+    columns: Dict[str, List[Any]] = {name: [] for name in names}
+    for row in rows:
+        for name, value in zip(names, row):
+            columns[name].append(json.loads(value) if name == "metadata" else value)
+    return json.dumps({"table": table, "columns": columns}, ensure_ascii=False) + "\n"
+
+
+def export_records(
+    database: db.Database,
+    stream: TextIO,
+    format: str = "ndjson",
+    tables: Sequence[str] = TABLES,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, int]:
+    """Write ``tables`` to ``stream`` in chunks of ``chunk_size`` rows; return the row count per table.
+
+    Rows are read from a single snapshot, so the export is consistent even with concurrent writers.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unknown export format {format!r}")
+    unknown = set(tables) - set(TABLES)
+    if unknown:
+        raise ValueError(f"Unknown tables: {sorted(unknown)}")
+
+    counts = {table: 0 for table in tables}
+    connection = database.connect()
+    try:
+        connection.execute("BEGIN")  # one read snapshot across both tables
+        for table in TABLES:
+            if table not in counts:
+                continue
+            chunks = _note_rows(connection, chunk_size) if table == "notes" else _exercise_rows(connection, chunk_size)
+            for rows in chunks:
+                stream.write(_ndjson_lines(table, rows) if format == "ndjson" else _columnar_line(table, rows))
+                counts[table] += len(rows)
+        connection.rollback()
+    finally:
+        connection.close()
+    return counts
+
+
+def _records(stream: Iterable[str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    for line_number, line in enumerate(stream, start=1):
+        if line.isspace() or not line:
+            continue
+        record = _decode(line)
+        columns = record.get("columns")
+        if columns is None:
+            yield line_number, record
+            continue
+        table = record["table"]
+        names = list(columns)
+        for values in zip(*(columns[name] for name in names)):
+            yield line_number, {"table": table, **dict(zip(names, values))}
+
+
+class _BatchWriter:
+    """Insert buffered records one ``BEGIN IMMEDIATE`` transaction per batch, remapping note ids.
+
+    The exported -> new note id mapping is a dict until it would exceed ``max_mapped_notes``
+    entries; from then on it lives in a temporary table on the import connection, so memory stays
+    bounded however many notes are imported.
+    """
+
+    def __init__(self, database: db.Database, result: ImportResult, keep_note_ids: bool, max_mapped_notes: int):
+        self._database = database
+        self._result = result
+        self._keep_note_ids = keep_note_ids
+        self._max_mapped_notes = max_mapped_notes
+        self._note_ids: Optional[Dict[int, int]] = {}
+        self._notes: List[Dict[str, Any]] = []
+        self._exercises: List[Tuple[int, Dict[str, Any]]] = []
+        self.pending = 0
+
+    def add(self, line_number: int, record: Dict[str, Any]) -> None:
+        self.pending += 1
+        table = record.get("table")
+        if table == "notes":
+            self._notes.append(record)
+        elif table == "exercises":
+            self._exercises.append((line_number, record))
+        else:
+            raise ValueError(f"Line {line_number}: unknown table {table!r}")
+
+    def flush(self, connection: sqlite3.Connection) -> None:
+        if not self.pending:
+            return
+        threshold = self._database.compress_threshold
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Explicit ids allocated under the write lock let executemany keep the remapping.
+            (next_id,) = connection.execute(
+                "SELECT MAX(COALESCE((SELECT MAX(id) FROM notes), 0),"
+                " COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'notes'), 0)) + 1"
+            ).fetchone()
+            note_rows = []
+            mapping = []
+            for record in self._notes:
+                mapping.append((record["id"], next_id))
+                note_rows.append(
+                    (
+                        next_id,
+                        codec.encode_content(record["content"], threshold),
+                        record["source_type"],
+                        json.dumps(record["metadata"]),
+                        record["created_at"],
+                    )
+                )
+                next_id += 1
+            connection.executemany(
+                "INSERT INTO notes (id, content, source_type, metadata, created_at) VALUES (?, ?, ?, ?, ?)",
+                note_rows,
+            )
+            note_ids = self._note_ids
+            if note_ids is not None and len(note_ids) + len(mapping) > self._max_mapped_notes:
+                self._spill(connection)
+                note_ids = None
+            if note_ids is None:
+                connection.executemany(f"INSERT OR REPLACE INTO {_NOTE_IDS} (old_id, new_id) VALUES (?, ?)", mapping)
+            else:
+                # Updated before COMMIT so this batch's exercises resolve; a failed batch ends the import.
+                note_ids.update(mapping)
+            exercise_rows = []
+            for line_number, record in self._exercises:
+                payload, metadata = db.encode_exercise(record["type"], record["payload"], record["metadata"])
+                note_id = record["note_id"]
+                if note_ids is not None:
+                    note_id = note_ids.get(note_id)
+                    if note_id is None:
+                        raise ValueError(f"Line {line_number}: exercise references unknown note {record['note_id']}")
+                exercise_rows.append(
+                    (record["type"], record["difficulty"], payload, metadata, record["created_at"], note_id)
+                )
+            if note_ids is not None:
+                connection.executemany(
+                    "INSERT INTO exercises (type, difficulty, payload, metadata, created_at, note_id)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    exercise_rows,
+                )
+            else:
+                cursor = connection.executemany(
+                    f"""
+                    INSERT INTO exercises (note_id, type, difficulty, payload, metadata, created_at)
+                    SELECT new_id, ?, ?, ?, ?, ? FROM {_NOTE_IDS} WHERE old_id = ?
+                    """,
+                    exercise_rows,
+                )
+                if cursor.rowcount != len(exercise_rows):
+                    self._raise_unknown_note(connection)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        if self._keep_note_ids:
+            self._result.note_ids.update(mapping)
+        self._result.notes += len(note_rows)
+        self._result.exercises += len(exercise_rows)
+        self._notes.clear()
+        self._exercises.clear()
+        self.pending = 0
+
+    def _spill(self, connection: sqlite3.Connection) -> None:
+        """Move the in-memory note id mapping into the temporary table and use that from now on."""
+        connection.execute(f"CREATE TEMP TABLE {_NOTE_IDS} (old_id INTEGER PRIMARY KEY, new_id INTEGER NOT NULL)")
+        connection.executemany(f"INSERT INTO {_NOTE_IDS} (old_id, new_id) VALUES (?, ?)", self._note_ids.items())
+        self._note_ids = None
+
+    def _raise_unknown_note(self, connection: sqlite3.Connection) -> None:
+        for line_number, record in self._exercises:
+            known = connection.execute(f"SELECT 1 FROM {_NOTE_IDS} WHERE old_id = ?", (record["note_id"],)).fetchone()
+            if known is None:
+                raise ValueError(f"Line {line_number}: exercise references unknown note {record['note_id']}")
+        raise ValueError("Some exercises reference unknown notes")  # pragma: no cover - defensive
+
+
+def import_records(
+    database: db.Database,
+    stream: Iterable[str],
+    batch_size: int = DEFAULT_CHUNK_SIZE,
+    keep_note_ids: bool = False,
+    max_mapped_notes: int = DEFAULT_MAX_MAPPED_NOTES,
+) -> ImportResult:
+    """Bulk-load an export into ``database`` with new ids; exercises are re-pointed at the new note ids.
+
+    Exported notes must precede the exercises that reference them, as :func:`export_records` writes
+    them. Each batch is committed atomically; on error, earlier batches stay committed. Memory is
+    bounded by ``batch_size`` plus at most ``max_mapped_notes`` remembered note ids (beyond that the
+    mapping moves to a temporary table, which is slower), unless ``keep_note_ids`` asks for the
+    full id mapping in the result.
+    """
+    result = ImportResult()
+    writer = _BatchWriter(database, result, keep_note_ids, max_mapped_notes)
+    connection = database.connect()
+    connection.isolation_level = None  # transactions are managed explicitly per batch
+    try:
+        for line_number, record in _records(stream):
+            writer.add(line_number, record)
+            if writer.pending >= batch_size:
+                writer.flush(connection)
+        writer.flush(connection)
+    finally:
+        connection.close()
+    return result
+
+
+@contextmanager
+def _open_text(path: str, mode: str) -> Iterator[TextIO]:
+    if path == "-":
+        yield sys.stdout if "w" in mode else sys.stdin
+    elif path.endswith(".gz"):
+        with gzip.open(path, f"{mode}t", encoding="utf-8", compresslevel=6) as stream:
+            yield stream  # type: ignore[misc]
+    else:
+        with open(path, mode, encoding="utf-8") as stream:
+            yield stream
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m tgnotes.transfer", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Stream tables to NDJSON or columnar batches.")
+    export.add_argument("database", type=Path)
+    export.add_argument("output", help="Destination file, '-' for stdout; '.gz' enables gzip.")
+    export.add_argument("--format", choices=FORMATS, default="ndjson")
+    export.add_argument("--table", action="append", choices=TABLES, dest="tables")
+    export.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    load = commands.add_parser("import", help="Bulk-load an export with id remapping.")
+    load.add_argument("database", type=Path)
+    load.add_argument("input", help="Source file, '-' for stdin.")
+    load.add_argument("--batch-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    load.add_argument("--compress-threshold", type=int, help="Compress imported note contents of this many bytes.")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == "export":
+        database = db.Database(args.database)
+        with _open_text(args.output, "w") as stream:
+            counts = export_records(database, stream, args.format, args.tables or TABLES, args.chunk_size)
+    else:
+        database = db.Database(args.database, compress_threshold=args.compress_threshold)
+        db.init_db(database)
+        with _open_text(args.input, "r") as stream:
+            result = import_records(database, stream, args.batch_size)
+        counts = {"notes": result.notes, "exercises": result.exercises}
+    elapsed = time.perf_counter() - start
+    rows = sum(counts.values())
+    summary = ", ".join(f"{count} {table}" for table, count in counts.items())
+    print(f"{args.command}ed {summary} in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
+
+
+__all__ = ["FORMATS", "ImportResult", "export_records", "import_records", "main"]
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import random
+import time
+
+from tgnotes.models import Exercise
+from tgnotes.services.answer_checker import AnswerChecker, AnswerIndex, bounded_levenshtein, normalize
+
+
+def make_exercise(words, alternates=None, exercise_id: int = 1) -> Exercise:
+    metadata = {"words": list(words)}
+    if alternates:
+        metadata["alternates"] = alternates
+    return Exercise(note_id=1, type="recall_words", difficulty="easy", payload="", metadata=metadata, id=exercise_id)
+
+
+def test_normalize_and_bounded_distance():
+    assert normalize("  «Straße»! ") == "strasse"
+    assert normalize("Café", ignore_accents=True) == "cafe"
+    assert normalize("Haus", case_sensitive=True) == "Haus"
+    assert bounded_levenshtein("kitten", "sitting", 5) == 3
+    assert bounded_levenshtein("kitten", "sitting", 1) == 2
+
+
+def test_exact_case_insensitive_match_reports_case_mismatch():
+    checker = AnswerChecker()
+    exercise = make_exercise(["Haus", "language"])
+
+    match = checker.check(exercise, "haus")
+    assert match.expected == "Haus"
+    assert match.distance == 0
+    assert match.case_mismatch
+    assert not match.exact
+    assert checker.check(exercise, "Haus").exact
+
+
+def test_fuzzy_match_and_alternates():
+    exercise = make_exercise(["colour", "vocabulary"], alternates={"colour": ["color"]})
+    checker = AnswerChecker()
+
+    assert checker.check(exercise, "color").accepted == "color"
+    typo = checker.check(exercise, "vocabluary")
+    assert (typo.expected, typo.distance) == ("vocabulary", 2)
+    assert checker.check(exercise, "colr").expected == "colour"
+    assert checker.check(exercise, "grammar") is None
+    assert checker.check(exercise, "cat", max_distance=0) is None
+
+
+def test_string_alternate_is_a_single_form():
+    exercise = make_exercise(["colour", "grey"], alternates={"colour": "color", "grey": ["gray"]})
+    checker = AnswerChecker()
+
+    assert checker.check(exercise, "c") is None
+    assert checker.check(exercise, "o") is None
+    assert checker.check(exercise, "color").accepted == "color"
+    assert checker.check(exercise, "gray").expected == "grey"
+    first = checker.index_for(exercise)
+    exercise.metadata["alternates"] = {"colour": "colr", "grey": ["gray"]}
+    assert checker.index_for(exercise) is not first
+
+
+def test_expected_restricts_candidates():
+    checker = AnswerChecker()
+    exercise = make_exercise(["alpha", "beta"])
+
+    assert checker.check(exercise, "beta", expected="alpha") is None
+    assert checker.check(exercise, "alpah", expected="alpha") is None
+    assert checker.check(exercise, "alpah", expected="alpha", max_distance=2).distance == 2
+    assert checker.check(exercise, "alpa", expected="alpha").distance == 1
+
+
+def test_indexes_are_reused_and_invalidated_on_change():
+    checker = AnswerChecker()
+    exercise = make_exercise(["alpha", "beta"])
+
+    first = checker.index_for(exercise)
+    assert checker.index_for(exercise) is first
+    exercise.metadata["alternates"] = {"alpha": ["alfa"]}
+    assert checker.index_for(exercise) is not first
+    assert checker.check(exercise, "alfa").expected == "alpha"
+
+
+def test_large_index_lookup_is_sub_millisecond():
+    rng = random.Random(3)
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    words = ["".join(rng.choice(alphabet) for _ in range(rng.randint(4, 12))) for _ in range(2000)]
+    index = AnswerIndex(words, cache_size=0)
+    queries = [word[:-1] + "x" for word in rng.sample(words, 200)]
+
+    start = time.perf_counter()
+    for query in queries:
+        assert index.match(query) is not None
+    assert (time.perf_counter() - start) / len(queries) < 0.001
+
+
+def test_long_answers_are_rejected_quickly():
+    checker = AnswerChecker()
+    exercise = make_exercise(["alpha", "beta"])
+    pasted = "alpha beta " * 400
+    near_cap = "alphabet" * 30
+
+    start = time.perf_counter()
+    for answer in (pasted, near_cap):
+        assert checker.check(exercise, answer) is None
+        assert checker.check(exercise, answer, max_distance=2) is None
+        assert checker.check(exercise, answer, expected="alpha") is None
+    assert time.perf_counter() - start < 0.05
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import copy
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from tgnotes import db
+from tgnotes.benchmarks import BENCHMARKS, Context, compare, main, measure, run_benchmarks, synthetic_corpus
+
+
+def test_corpus_is_seeded():
+    assert synthetic_corpus(7, 3, 50) == synthetic_corpus(7, 3, 50)
+    assert synthetic_corpus(7, 3, 50) != synthetic_corpus(8, 3, 50)
+
+
+def test_run_all_benchmarks_at_small_scale():
+    results = run_benchmarks(scale=0.02)
+
+    assert set(results["benchmarks"]) == set(BENCHMARKS)
+    for result in results["benchmarks"].values():
+        assert result["ops_per_sec"] > 0
+        assert result["p99_ms"] >= result["p50_ms"] >= 0
+        assert result["peak_memory_kib"] >= 0
+
+
+@pytest.mark.parametrize("name", ["db.insert_note", "db.insert_exercise"])
+def test_benchmark_connections_are_closed(tmp_path: Path, monkeypatch, name: str):
+    opened = []
+    connect = db.Database.connect
+
+    def tracking_connect(self):
+        connection = connect(self)
+        opened.append(connection)
+        return connection
+
+    monkeypatch.setattr(db.Database, "connect", tracking_connect)
+    context = Context(seed=1, scale=0.01, workdir=tmp_path)
+    measure(BENCHMARKS[name], context)
+
+    assert opened and context.teardown == []
+    for connection in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {
+        "benchmarks": {"pipeline.process": {"ops_per_sec": 1000.0, "p50_ms": 1.0, "p99_ms": 2.0, "peak_memory_kib": 500.0}}
+    }
+    current = copy.deepcopy(baseline)
+    current["benchmarks"]["pipeline.process"]["ops_per_sec"] = 900.0
+    assert compare(current, baseline, threshold=0.2) == []
+
+    current["benchmarks"]["pipeline.process"]["ops_per_sec"] = 700.0
+    current["benchmarks"]["pipeline.process"]["p50_ms"] = 1.5
+    regressions = compare(current, baseline, threshold=0.2)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("pipeline.process: ops/sec")
+
+
+def test_cli_saves_and_checks_baseline(tmp_path: Path):
+    baseline = tmp_path / "baseline.json"
+    output = tmp_path / "results.json"
+    arguments = ["--only", "pipeline.process", "--scale", "0.02", "--baseline", str(baseline)]
+
+    assert main([*arguments, "--save-baseline"]) == 0
+    assert main([*arguments, "--output", str(output), "--threshold", "100"]) == 0
+    assert "pipeline.process" in json.loads(output.read_text())["benchmarks"]
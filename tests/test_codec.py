@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from tgnotes.codec import (
+    CompactPayload,
+    decode_content,
+    decode_payload,
+    encode_content,
+    encode_payload,
+)
+from tgnotes.services.exercise_generator import ExerciseGenerator, ExercisePayload
+
+
+def test_generated_payload_compacts_to_template():
+    payload = ExerciseGenerator(min_words=2).generate_move_words(["alpha", "beta", "gamma"])
+    compact = payload.to_compact()
+
+    assert compact.template_id is not None
+    assert compact.body is None
+    assert compact.serialize() == payload.serialize()
+
+
+def test_binary_round_trip_preserves_text_exactly():
+    payload = ExerciseGenerator(min_words=2).generate_recall_words(["straße", "язык", "言語"])
+    blob = encode_payload(payload.to_compact(), words_in_metadata=True)
+    decoded, words_in_metadata = decode_payload("recall_words", blob)
+
+    assert words_in_metadata
+    assert decoded.words == ("straße", "язык", "言語")
+    assert decoded.serialize() == payload.serialize()
+    assert len(blob) < len(payload.serialize().encode("utf-8")) / 3
+
+
+def test_free_form_body_is_kept_and_compressed():
+    body = "\n".join(f"{number}. There is a __, it can be __" for number in range(100))
+    payload = ExercisePayload(type="move_words", words=["tree", "green"], body=body)
+    compact = payload.to_compact()
+    blob = encode_payload(compact)
+
+    assert compact.template_id is None
+    assert len(blob) < len(body)
+    assert decode_payload("move_words", blob)[0].serialize() == payload.serialize()
+
+
+def test_parse_rejects_text_that_would_not_round_trip():
+    text = ExerciseGenerator(min_words=2).generate_move_words(["alpha", "beta"]).serialize()
+
+    assert CompactPayload.parse("move_words", text).serialize() == text
+    assert CompactPayload.parse("recall_words", text) is None
+    assert CompactPayload.parse("move_words", text + "\n") is None
+
+
+def test_content_compression_threshold():
+    text = "repetition " * 500
+
+    assert encode_content("short", threshold=64) == "short"
+    assert encode_content(text, threshold=None) == text
+    compressed = encode_content(text, threshold=64)
+    assert isinstance(compressed, bytes)
+    assert decode_content(compressed) == text
+
+
+def test_parse_prefers_metadata_words_over_the_header_line():
+    body = "- Recall a definition or usage example for 'ice, cream'.\n- Recall a definition or usage example for 'tea'."
+    text = ExercisePayload(type="recall_words", words=["ice, cream", "tea"], body=body).serialize()
+
+    assert CompactPayload.parse("recall_words", text, ["ice, cream", "tea"]).words == ("ice, cream", "tea")
+    # Splitting the header is ambiguous but still reproduces the text byte for byte.
+    fallback = CompactPayload.parse("recall_words", text)
+    assert fallback.words == ("ice", "cream", "tea")
+    assert fallback.serialize() == text
+
+
+def test_parsed_payloads_serialize_back_exactly():
+    texts = [
+        ExercisePayload(type="move_words", words=[], body="").serialize(),
+        ExercisePayload(type="move_words", words=["", "a\nb"], body="free\n\nform").serialize(),
+        ExercisePayload(type="move_words", words=["x"], body="exercise_start\nexercise_end").serialize(),
+        "type: move_words\nwords: \nexercise_start\n\nexercise_end",
+    ]
+
+    for text in texts:
+        for words in (None, ["", "a\nb"], ["x"]):
+            parsed = CompactPayload.parse("move_words", text, words)
+            assert parsed is not None and parsed.serialize() == text
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+
+from tgnotes import db
+from tgnotes.codec import CompactPayload
+from tgnotes.models import Note
+from tgnotes.repositories import ExerciseRepository, NoteRepository
+from tgnotes.services.exercise_generator import ExerciseGenerator, ExercisePayload
+from tgnotes.services.exercise_service import ExerciseService
+
+
+def _stored_row(database, exercise_id: int):
+    with database.session() as connection:
+        return connection.execute(
+            "SELECT typeof(payload) AS kind, payload, metadata FROM exercises WHERE id = ?", (exercise_id,)
+        ).fetchone()
+
+
+def test_exercises_are_stored_compactly(temp_database, sample_text: str):
+    note = NoteRepository(temp_database).create(content=sample_text, source_type="raw")
+    service = ExerciseService(ExerciseRepository(temp_database))
+    created = service.create_recall_words(note, ["alpha", "beta", "gamma"], difficulty="easy", metadata={"topic": "x"})
+
+    row = _stored_row(temp_database, created.id)
+    assert row["kind"] == "blob"
+    assert len(row["payload"]) < len(created.payload) / 3
+    assert "words" not in json.loads(row["metadata"])
+
+    (loaded,) = ExerciseRepository(temp_database).list_for_note(note.id)
+    assert loaded.payload == created.payload
+    assert loaded.metadata == created.metadata
+
+
+def test_compact_models_are_stored_without_rendering(temp_database, sample_text: str, monkeypatch):
+    note = NoteRepository(temp_database).create(content=sample_text, source_type="raw")
+    generator = ExerciseGenerator(min_words=2)
+    repository = ExerciseRepository(temp_database)
+    payload = generator.generate_move_words(["alpha", "beta"])
+    built = generator.as_compact_model(note, payload, difficulty="easy")
+    rendered = []
+    serialize = CompactPayload.serialize
+    monkeypatch.setattr(CompactPayload, "serialize", lambda self: rendered.append(self) or serialize(self))
+
+    repository.add(built)
+
+    assert rendered == []
+    assert _stored_row(temp_database, built.id)["kind"] == "blob"
+    assert built.render_payload() == payload.serialize()
+    assert built.render_payload() == payload.serialize()
+    assert len(rendered) == 1
+    exercise = built.to_exercise()
+    assert (exercise.id, exercise.payload) == (built.id, payload.serialize())
+    (loaded,) = repository.list_for_note(note.id)
+    assert loaded == exercise
+
+
+def test_migration_compacts_legacy_rows(temp_database, sample_text: str):
+    generator = ExerciseGenerator(min_words=2)
+    with temp_database.session() as connection:
+        note = db.insert_note(connection, Note(content=sample_text * 200, source_type="raw"))
+        legacy = generator.as_model(note, generator.generate_move_words(["alpha", "beta"]), difficulty="easy")
+        legacy = db.insert_exercise(connection, legacy, compact=False)
+        custom = generator.as_model(note, generator.generate_move_words(["alpha", "beta"]), difficulty="easy")
+        custom.payload = "hand written protocol"
+        custom = db.insert_exercise(connection, custom, compact=False)
+
+    assert _stored_row(temp_database, legacy.id)["kind"] == "text"
+    counts = db.migrate_compact_storage(temp_database, compress_threshold=1024, batch_size=1, vacuum=True)
+
+    assert counts == {"exercises": 1, "notes": 1}
+    assert _stored_row(temp_database, legacy.id)["kind"] == "blob"
+    assert _stored_row(temp_database, custom.id)["kind"] == "text"
+    with temp_database.session() as connection:
+        loaded = db.list_exercises(connection, note.id)
+        (loaded_note,) = db.list_notes(connection)
+    assert [exercise.payload for exercise in loaded] == [legacy.payload, "hand written protocol"]
+    assert loaded[0].metadata == legacy.metadata
+    assert loaded_note.content == sample_text * 200
+    assert db.migrate_compact_storage(temp_database, compress_threshold=1024) == {"exercises": 0, "notes": 0}
+
+
+def test_note_content_compression(tmp_path, sample_text: str):
+    database = db.Database(tmp_path / "compressed.db", compress_threshold=256)
+    db.init_db(database)
+    repository = NoteRepository(database)
+    repository.create(content=sample_text, source_type="raw")
+    repository.create(content=sample_text * 100, source_type="raw")
+
+    with database.session() as connection:
+        kinds = [row[0] for row in connection.execute("SELECT typeof(content) FROM notes ORDER BY id")]
+    assert kinds == ["text", "blob"]
+    assert [note.content for note in repository.list_all()] == [sample_text, sample_text * 100]
+
+
+def test_encode_exercise_falls_back_for_unusual_words():
+    generator = ExerciseGenerator(min_words=2)
+    text = generator.generate_move_words(["alpha", "beta"]).serialize()
+
+    payload, metadata = db.encode_exercise("move_words", text, {"words": ["alpha", "beta"]})
+    assert isinstance(payload, bytes)
+    assert json.loads(metadata) == {}
+
+    # Non-string words cannot be the protocol's word list: the payload is still compacted from
+    # the header line, but the metadata keeps its own copy.
+    payload, metadata = db.encode_exercise("move_words", text, {"words": ["alpha", 2]})
+    assert isinstance(payload, bytes)
+    assert json.loads(metadata) == {"words": ["alpha", 2]}
+
+    payload, metadata = db.encode_exercise("move_words", text.replace("beta", "be\x00ta"), {})
+    assert payload == text.replace("beta", "be\x00ta")
+    assert json.loads(metadata) == {}
+
+
+def test_unusual_words_round_trip_through_storage(temp_database, sample_text: str):
+    generator = ExerciseGenerator(min_words=2)
+    note = NoteRepository(temp_database).create(content=sample_text, source_type="raw")
+    repository = ExerciseRepository(temp_database)
+    words = ["ice, cream", "tea"]
+    body = "\n".join(f"- Recall a definition or usage example for '{word}'." for word in words)
+    comma = generator.as_model(note, ExercisePayload(type="recall_words", words=words, body=body), difficulty="easy")
+    created = [
+        repository.create(note.id, comma.type, "easy", comma.payload, comma.metadata),
+        repository.create(note.id, comma.type, "easy", comma.payload, {"words": ["ice, cream", 1]}),
+    ]
+
+    loaded = repository.list_for_note(note.id)
+    assert [(e.payload, e.metadata) for e in loaded] == [(e.payload, e.metadata) for e in created]
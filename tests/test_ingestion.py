@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from tgnotes.repositories import ExerciseRepository, NoteRepository
+from tgnotes.services import (
+    ExerciseService,
+    IngestionItem,
+    IngestionService,
+    PdfImporter,
+    StageConfig,
+    WebContentImporter,
+)
+from tgnotes.services.ocr_importer import OcrImporter
+
+
+class StubPdfBackend:
+    def open(self, path: Path):
+        return _StubDocument(path.read_text())
+
+
+class _StubDocument:
+    def __init__(self, text: str):
+        self.pages = [_StubPage(line) for line in text.splitlines()]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class _StubPage:
+    def __init__(self, text: str):
+        self._text = text
+
+    def extract_text(self) -> str:
+        return self._text
+
+
+class StubOcrEngine:
+    def image_to_string(self, image):
+        return image.decode("utf-8")
+
+
+def stub_fetcher(url: str, notion_api_token: str | None = None) -> str:
+    return "<html><body><h1>Weekly vocabulary</h1><p>Practice makes progress every day.</p></body></html>"
+
+
+def build_service(database, **stages) -> IngestionService:
+    return IngestionService(
+        NoteRepository(database),
+        ExerciseService(ExerciseRepository(database)),
+        pdf_importer=PdfImporter(backend=StubPdfBackend()),
+        ocr_importer=OcrImporter(engine=StubOcrEngine()),
+        web_importer=WebContentImporter(fetcher=stub_fetcher),
+        **stages,
+    )
+
+
+def test_ingest_mixed_batch(tmp_path: Path, temp_database, sample_text: str):
+    pdf_path = tmp_path / "chapter.pdf"
+    pdf_path.write_text("Language learning with notes.\nSecond page of reading material.")
+    image_path = tmp_path / "screenshot.png"
+    image_path.write_bytes(b"Image based content for vocabulary drills")
+
+    report = build_service(temp_database).ingest(
+        [
+            pdf_path,
+            image_path,
+            IngestionItem("https://notion.so/page", notion_api_token="secret"),
+            IngestionItem(sample_text, metadata={"topic": "demo"}),
+        ]
+    )
+
+    assert [result.ok for result in report.results] == [True, True, True, True]
+    source_types = [result.note.source_type for result in report.results]
+    assert source_types == ["pdf", "image", "notion", "raw"]
+    assert report.results[3].note.metadata["topic"] == "demo"
+    assert all(len(result.exercises) == 2 for result in report.results)
+    assert len(NoteRepository(temp_database).list_all()) == 4
+    assert report.stages["generate"].processed == 4
+    assert report.stages["fetch"].throughput > 0
+
+
+def test_failures_are_isolated_per_item(tmp_path: Path, temp_database, sample_text: str):
+    report = build_service(temp_database).ingest(
+        [
+            tmp_path / "missing.pdf",
+            IngestionItem("too short"),
+            sample_text,
+        ]
+    )
+
+    missing, short, good = report.results
+    assert missing.failed_stage == "fetch"
+    assert "FileNotFoundError" in missing.error
+    assert short.failed_stage == "generate"
+    assert short.note is not None
+    assert good.ok
+    assert report.failed == [missing, short]
+    assert report.stages["fetch"].failed == 1
+    assert report.stages["generate"].failed == 1
+
+
+def test_string_paths_are_classified_by_suffix(tmp_path: Path, temp_database):
+    pdf_path = tmp_path / "chapter.pdf"
+    pdf_path.write_text("Language learning with notes.\nSecond page of reading material.")
+
+    report = build_service(temp_database).ingest(
+        [IngestionItem(str(pdf_path), kind="pdf"), str(pdf_path), "Tonight I finally finished reading chapter.pdf"]
+    )
+
+    pdf, path_string, sentence = report.results
+    assert pdf.ok
+    assert pdf.note.source_type == "pdf"
+    assert pdf.note.metadata["path"] == str(pdf_path)
+    assert pdf.note.content.startswith("Language learning with notes.")
+    # Strings are raw text unless ``kind`` says otherwise; the filesystem is never consulted.
+    assert path_string.item.resolved_kind() == "text"
+    assert path_string.note.source_type == "raw"
+    assert path_string.note.content == str(pdf_path)
+    assert sentence.note.source_type == "raw"
+
+
+def test_process_executor_and_small_queues(temp_database, sample_text: str):
+    service = build_service(
+        temp_database,
+        fetch=StageConfig(workers=2, queue_size=1),
+        process=StageConfig(workers=2, executor="process", queue_size=1),
+        generate=StageConfig(workers=1, queue_size=1),
+    )
+
+    texts = [f"{sample_text} Batch number {index}." for index in range(12)]
+    report = service.ingest(iter(texts))
+
+    assert len(report.succeeded) == 12
+    assert [result.index for result in report.results] == list(range(12))
+    assert report.results[5].note.content.endswith("Batch number 5.")
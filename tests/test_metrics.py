@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from pathlib import Path
+from urllib.request import urlopen
+
+import pytest
+
+from tgnotes import metrics
+from tgnotes.metrics import MetricsRegistry
+from tgnotes.services.pipeline import TextProcessingPipeline
+
+
+@pytest.fixture()
+def enabled_registry():
+    metrics.REGISTRY.reset()
+    metrics.enable()
+    yield metrics.REGISTRY
+    metrics.disable()
+    metrics.REGISTRY.reset()
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry(enabled=True)
+    registry.counter("jobs_total", "Jobs seen.").inc(kind="pdf")
+    registry.counter("jobs_total").inc(2, kind="pdf")
+    histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="a")
+    histogram.observe(0.5, stage="a")
+
+    text = registry.render()
+
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{kind="pdf"} 3' in text
+    assert 'latency_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{stage="a",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{stage="a"} 2' in text
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+
+    @registry.timed("noop")
+    def work() -> int:
+        return 42
+
+    assert work() == 42
+    with registry.timer("noop"):
+        pass
+    assert registry.render() == ""
+
+
+def test_timed_records_outcome_and_notifies_sinks():
+    registry = MetricsRegistry(enabled=True)
+    events = []
+    registry.add_sink(lambda kind, name, value, labels: events.append((kind, name, labels)))
+
+    @registry.timed("flaky")
+    def fail() -> None:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        fail()
+
+    calls = registry.counter(metrics.STAGE_CALLS)
+    assert calls.value(stage="flaky", outcome="error") == 1
+    assert registry.histogram(metrics.STAGE_DURATION).count(stage="flaky") == 1
+    assert ("counter", metrics.STAGE_CALLS, {"stage": "flaky", "outcome": "error"}) in events
+
+
+def test_instrumented_entry_points(temp_database, enabled_registry, sample_text: str):
+    TextProcessingPipeline().process(sample_text)
+    with temp_database.session() as connection:
+        connection.execute("SELECT 1")
+
+    durations = enabled_registry.histogram(metrics.STAGE_DURATION)
+    assert durations.count(stage="pipeline.process") == 1
+    assert durations.count(stage="db.session") == 1
+    assert durations.count(stage="db.commit") == 1
+
+
+def test_write_and_serve_exposition(tmp_path: Path):
+    registry = MetricsRegistry(enabled=True)
+    registry.record_stage("demo", 0.2)
+
+    path = registry.write(tmp_path / "metrics" / "tgnotes.prom")
+    assert 'stage="demo"' in path.read_text()
+
+    server = registry.serve(port=0)
+    try:
+        host, port = server.server_address[:2]
+        with urlopen(f"http://{host}:{port}/metrics") as response:
+            body = response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert "tgnotes_stage_duration_seconds_count" in body
+
+
+def test_failing_sink_does_not_affect_instrumented_code(temp_database, enabled_registry):
+    def broken_sink(kind, name, value, labels):
+        raise RuntimeError("sink down")
+
+    enabled_registry.add_sink(broken_sink)
+    try:
+        with temp_database.session() as connection:
+            connection.execute(
+                "INSERT INTO notes (content, source_type, metadata, created_at) VALUES ('x', 'raw', '{}', '2024-01-01')"
+            )
+    finally:
+        enabled_registry.remove_sink(broken_sink)
+
+    calls = enabled_registry.counter(metrics.STAGE_CALLS)
+    assert calls.value(stage="db.commit", outcome="ok") == 1
+    errors = enabled_registry.counter(metrics.SINK_ERRORS)
+    assert errors.value(sink=broken_sink.__qualname__) > 0
+    with temp_database.session() as connection:
+        assert connection.execute("SELECT COUNT(*) FROM notes").fetchone()[0] == 1
@@ -18,3 +18,14 @@ def test_ocr_importer_with_stub(tmp_path: Path):
     importer = OcrImporter(engine=StubEngine())
     text = importer.parse(image_path)
     assert text == "stubbed text"
+
+
+def test_module_level_backends_can_be_replaced(tmp_path: Path, monkeypatch):
+    from tgnotes.services import ocr_importer
+
+    image_path = tmp_path / "image.png"
+    image_path.write_bytes(b"module level engine")
+    monkeypatch.setattr(ocr_importer, "pytesseract", StubEngine(), raising=False)
+    monkeypatch.setattr(ocr_importer, "Image", None, raising=False)
+
+    assert OcrImporter().parse(image_path) == "module level engine"
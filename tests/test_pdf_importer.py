@@ -35,3 +35,13 @@ def test_pdf_importer_reads_text(tmp_path: Path):
     importer = PdfImporter(backend=StubPdfBackend())
     content = importer.parse(pdf_path)
     assert "Hello from PDF" in content
+
+
+def test_module_level_pdfplumber_can_be_replaced(tmp_path: Path, monkeypatch):
+    from tgnotes.services import pdf_importer
+
+    pdf_path = tmp_path / "sample.pdf"
+    pdf_path.write_text("Patched backend")
+    monkeypatch.setattr(pdf_importer, "pdfplumber", StubPdfBackend(), raising=False)
+
+    assert PdfImporter().parse(pdf_path) == "Patched backend"
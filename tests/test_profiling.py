@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+import pstats
+import random
+from pathlib import Path
+
+import pytest
+
+from tgnotes.profiling import Profiler, load_runs, main
+from tgnotes.repositories import ExerciseRepository, NoteRepository
+from tgnotes.services import ExerciseService, IngestionService, StageConfig
+from tgnotes.services.pipeline import TextProcessingPipeline
+
+
+def test_forced_run_writes_profile_and_memory(tmp_path: Path, sample_text: str):
+    profiler = Profiler(tmp_path, top_n=5)
+
+    with profiler.run(label="upload", force=True) as run:
+        with run.stage("process"):
+            TextProcessingPipeline().process(sample_text * 50)
+        run.note_id = 7
+
+    assert run.profiled
+    assert (run.path / "profile.pstats").exists()
+    assert (run.path / "memory.txt").read_text()
+    record = json.loads((run.path / "run.json").read_text())
+    assert record["note_id"] == 7
+    assert record["label"] == "upload"
+    assert "process" in record["timings"]
+    assert record["peak_memory"] > 0
+
+
+def test_unsampled_run_is_not_recorded(tmp_path: Path):
+    profiler = Profiler(tmp_path, sample_rate=0.0)
+
+    with profiler.run() as run:
+        pass
+
+    assert not run.profiled
+    assert load_runs(tmp_path) == []
+
+
+def test_sampling_rate_and_rotation(tmp_path: Path):
+    profiler = Profiler(tmp_path, sample_rate=1.0, max_runs=2, rng=random.Random(0))
+
+    for note_id in range(4):
+        with profiler.run(note_id=note_id):
+            pass
+
+    assert [record["note_id"] for record in load_runs(tmp_path)] == [2, 3]
+
+
+def test_failed_run_records_error(tmp_path: Path):
+    profiler = Profiler(tmp_path)
+
+    with pytest.raises(RuntimeError):
+        with profiler.run(force=True):
+            raise RuntimeError("ocr exploded")
+
+    (record,) = load_runs(tmp_path)
+    assert record["error"] == "RuntimeError: ocr exploded"
+
+
+def test_summarize_cli(tmp_path: Path, capsys):
+    profiler = Profiler(tmp_path)
+    with profiler.run(note_id=1, force=True):
+        pass
+
+    assert main(["summarize", str(tmp_path), "--top", "3"]) == 0
+    output = capsys.readouterr().out
+    assert "Slowest runs:" in output
+    assert "note=1" in output
+
+
+def test_ingestion_workers_are_profiled(tmp_path: Path, temp_database, sample_text: str):
+    profiler = Profiler(tmp_path / "profiles", sample_rate=1.0)
+    service = IngestionService(
+        NoteRepository(temp_database), ExerciseService(ExerciseRepository(temp_database)), profiler=profiler
+    )
+
+    report = service.ingest([sample_text, sample_text])
+
+    assert all(result.ok for result in report.results)
+    (record,) = load_runs(tmp_path / "profiles")
+    assert record["note_ids"] == [result.note.id for result in report.results]
+    assert set(record["timings"]) == {"fetch", "process", "persist", "generate"}
+    functions = {name for _, _, name in pstats.Stats(str(Path(record["path"]) / "profile.pstats")).stats}
+    assert {"process", "insert_note", "create_recall_words"} <= functions
+
+
+def test_profiled_ingestion_with_process_executors(tmp_path: Path, temp_database, sample_text: str):
+    profiler = Profiler(tmp_path / "profiles", sample_rate=1.0)
+    service = IngestionService(
+        NoteRepository(temp_database),
+        ExerciseService(ExerciseRepository(temp_database)),
+        fetch=StageConfig(workers=1, executor="process"),
+        generate=StageConfig(workers=1, executor="process"),
+        profiler=profiler,
+    )
+
+    report = service.ingest([sample_text])
+
+    assert report.results[0].ok, report.results[0].error
+    (record,) = load_runs(tmp_path / "profiles")
+    assert record["note_ids"] == [report.results[0].note.id]
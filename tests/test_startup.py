@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import tgnotes
+import tgnotes.services
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+# Generous enough for slow CI machines, tight enough to catch an eager import of a heavy backend.
+IMPORT_BUDGET_US = 50_000
+HEAVY_MODULES = {"pdfplumber", "PIL", "pytesseract", "urllib.request", "sqlite3", "concurrent.futures"}
+
+
+def import_times(statement: str) -> dict[str, int]:
+    """Run ``statement`` under ``python -X importtime`` and return cumulative microseconds per module."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC), os.environ.get("PYTHONPATH")]))}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_services_import_is_lazy_and_within_budget():
+    times = import_times("import tgnotes.services")
+
+    assert HEAVY_MODULES.isdisjoint(times)
+    assert not any(module.startswith("tgnotes.services.") for module in times)
+    # The cumulative time of the top-level import includes the parent package.
+    assert times["tgnotes.services"] < IMPORT_BUDGET_US
+
+
+def test_text_pipeline_does_not_load_importers():
+    times = import_times("from tgnotes.services import TextProcessingPipeline")
+
+    assert "tgnotes.services.pipeline" in times
+    assert "tgnotes.services.pdf_importer" not in times
+    assert "tgnotes.services.ocr_importer" not in times
+    assert HEAVY_MODULES.isdisjoint(times)
+
+
+def test_public_names_resolve_lazily():
+    for name in tgnotes.services.__all__:
+        assert getattr(tgnotes.services, name).__name__ == name
+    assert set(tgnotes.__all__) <= set(dir(tgnotes))
+    assert tgnotes.Database.__name__ == "Database"
+
+
+def test_submodules_stay_reachable_as_attributes():
+    statement = (
+        "import tgnotes, tgnotes.services\n"
+        "assert tgnotes.db.Database is tgnotes.Database\n"
+        "assert tgnotes.services.pipeline.TextProcessingPipeline.__name__ == 'TextProcessingPipeline'\n"
+        "for package in (tgnotes, tgnotes.services):\n"
+        "    try:\n"
+        "        package.missing\n"
+        "    except AttributeError:\n"
+        "        pass\n"
+        "    else:\n"
+        "        raise SystemExit('missing attribute resolved')\n"
+    )
+    import_times(statement)
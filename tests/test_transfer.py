@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from tgnotes import db
+from tgnotes.repositories import ExerciseRepository, NoteRepository
+from tgnotes.services.exercise_service import ExerciseService
+from tgnotes.transfer import export_records, import_records, main
+
+
+def populate(database: db.Database, sample_text: str, notes: int = 3) -> None:
+    note_repository = NoteRepository(database)
+    exercises = ExerciseService(ExerciseRepository(database))
+    for index in range(notes):
+        note = note_repository.create(content=f"{sample_text} #{index} язык", source_type="raw", metadata={"n": index})
+        units = ["alpha", "beta", "gamma", f"word{index}"]
+        exercises.create_move_words(note, units[:3], difficulty="easy")
+        exercises.create_recall_words(note, units[:3], difficulty="hard", metadata={"topic": "demo"})
+
+
+def snapshot(database: db.Database):
+    with database.session() as connection:
+        notes = db.list_notes(connection)
+        exercises = [db.list_exercises(connection, note.id) for note in notes]
+    return (
+        [(note.content, note.source_type, note.metadata) for note in notes],
+        [[(e.type, e.difficulty, e.payload, e.metadata) for e in group] for group in exercises],
+    )
+
+
+@pytest.mark.parametrize("format", ["ndjson", "columnar"])
+def test_round_trip_into_non_empty_database(tmp_path: Path, temp_database, sample_text: str, format: str):
+    populate(temp_database, sample_text)
+    stream = io.StringIO()
+    counts = export_records(temp_database, stream, format=format, chunk_size=2)
+
+    target = db.Database(tmp_path / "target.db")
+    db.init_db(target)
+    NoteRepository(target).create(content="already here", source_type="raw")
+    stream.seek(0)
+    result = import_records(target, stream, batch_size=4, keep_note_ids=True)
+
+    assert counts == {"notes": 3, "exercises": 6}
+    assert (result.notes, result.exercises) == (3, 6)
+    assert result.note_ids == {1: 2, 2: 3, 3: 4}
+    notes, exercises = snapshot(target)
+    assert notes[1:] == snapshot(temp_database)[0]
+    assert exercises[1:] == snapshot(temp_database)[1]
+
+
+# 3 spills the note id mapping to the temporary table midway through the import, 0 before it starts.
+@pytest.mark.parametrize("max_mapped_notes", [100_000, 3, 0])
+def test_note_id_mapping_is_not_kept_by_default(
+    tmp_path: Path, temp_database, sample_text: str, max_mapped_notes: int
+):
+    populate(temp_database, sample_text, notes=5)
+    stream = io.StringIO()
+    export_records(temp_database, stream)
+
+    target = db.Database(tmp_path / "target.db")
+    db.init_db(target)
+    stream.seek(0)
+    result = import_records(target, stream, batch_size=2, max_mapped_notes=max_mapped_notes)
+
+    assert (result.notes, result.exercises, result.note_ids) == (5, 10, {})
+    assert snapshot(target) == snapshot(temp_database)
+
+
+def test_export_restores_words_and_text_payload(temp_database, sample_text: str):
+    populate(temp_database, sample_text, notes=1)
+    stream = io.StringIO()
+    export_records(temp_database, stream, tables=["exercises"])
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert {record["table"] for record in records} == {"exercises"}
+    assert records[1]["metadata"]["topic"] == "demo"
+    assert records[1]["metadata"]["words"] == ["alpha", "beta", "gamma"]
+    assert records[1]["payload"].startswith("type: recall_words\nwords: alpha, beta, gamma")
+
+
+@pytest.mark.parametrize("max_mapped_notes", [100_000, 0])
+def test_exercise_with_unknown_note_is_rejected(temp_database, max_mapped_notes: int):
+    line = json.dumps(
+        {
+            "table": "exercises",
+            "id": 1,
+            "note_id": 99,
+            "type": "move_words",
+            "difficulty": "easy",
+            "payload": "free text",
+            "metadata": {},
+            "created_at": "2024-01-01T00:00:00",
+        }
+    )
+    with pytest.raises(ValueError, match="unknown note 99"):
+        import_records(temp_database, io.StringIO(line + "\n"), max_mapped_notes=max_mapped_notes)
+    assert snapshot(temp_database) == ([], [])
+
+
+def test_cli_round_trip_with_gzip(tmp_path: Path, temp_database, sample_text: str):
+    populate(temp_database, sample_text)
+    dump = tmp_path / "backup.ndjson.gz"
+    target = tmp_path / "restored.db"
+
+    assert main(["export", str(temp_database.path), str(dump)]) == 0
+    assert main(["import", str(target), str(dump), "--batch-size", "2"]) == 0
+    assert snapshot(db.Database(target)) == snapshot(temp_database)